@@ -1,6 +1,8 @@
 from django.contrib import admin
+from django.utils.html import format_html
 
-from .models import Category, Location, Post
+from .images import get_variant, prefetch_variants
+from .models import Category, Comment, ImageVariant, Location, Post
 
 admin.site.empty_value_display = 'Не задано'
 
@@ -58,9 +60,12 @@ class LocationAdmin(admin.ModelAdmin):
 @admin.register(Post)
 class PostAdmin(admin.ModelAdmin):
     list_display = (
+        'image_thumb',
         'title',
         'text',
         'author',
+        'comment_count',
+        'is_visible',
     )
     list_filter = (
         'category',
@@ -72,3 +77,53 @@ class PostAdmin(admin.ModelAdmin):
     search_fields = (
         'text',
     )
+
+    def get_changelist_instance(self, request):
+        changelist = super().get_changelist_instance(request)
+        prefetch_variants(changelist.result_list)
+        return changelist
+
+    @admin.display(description='Фото')
+    def image_thumb(self, post):
+        variant = get_variant(post, 'thumb')
+        if variant is None:
+            return None
+        return format_html(
+            '<img src="{}" width="{}" height="{}">',
+            variant.file.url, variant.width, variant.height
+        )
+
+
+@admin.register(Comment)
+class CommentAdmin(admin.ModelAdmin):
+    list_display = (
+        'text',
+        'post',
+        'author',
+        'is_published',
+    )
+    list_filter = (
+        'is_published',
+    )
+    list_editable = (
+        'is_published',
+    )
+    raw_id_fields = (
+        'post',
+    )
+
+
+@admin.register(ImageVariant)
+class ImageVariantAdmin(admin.ModelAdmin):
+    list_display = (
+        'source',
+        'size',
+        'width',
+        'height',
+    )
+    list_filter = (
+        'size',
+    )
+    search_fields = (
+        'source',
+    )
@@ -0,0 +1,165 @@
+import hashlib
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.middleware.csrf import get_token
+from django.utils.http import quote_etag
+
+from .models import Category, Post
+
+GLOBAL_SCOPE = 'all'
+FEED_SCOPE = 'feed'
+
+
+def category_scope(slug):
+    return f'category:{slug}'
+
+
+def author_scope(username):
+    return f'author:{username}'
+
+
+def post_scope(post_id):
+    return f'post:{post_id}'
+
+
+def count_scope(scope):
+    """Область числа публикаций ленты.
+
+    Меняется вместе с составом ленты, а не с комментариями к ней.
+    """
+    return f'count:{scope}'
+
+
+def scopes_for(category_ids, author_ids):
+    """Области кеша лент с публикациями этих категорий и авторов.
+
+    Области адресуются так же, как страницы, — по slug и username,
+    чтобы ключ страницы строился без запросов к базе.
+    """
+    scopes = {FEED_SCOPE}
+    category_ids = {pk for pk in category_ids if pk is not None}
+    author_ids = {pk for pk in author_ids if pk is not None}
+    if category_ids:
+        scopes.update(map(category_scope, Category.objects.filter(
+            pk__in=category_ids).values_list('slug', flat=True)))
+    if author_ids:
+        scopes.update(map(author_scope, get_user_model().objects.filter(
+            pk__in=author_ids).values_list('username', flat=True)))
+    return scopes
+
+
+def post_scopes(post):
+    """Области кеша, в которых показывается публикация."""
+    return scopes_for(
+        (post.category_id, getattr(post, '_loaded_category_id', None)),
+        (post.author_id, getattr(post, '_loaded_author_id', None)),
+    ) | {post_scope(post.pk)}
+
+
+def bump_post_versions(post_ids):
+    rows = Post.objects.filter(pk__in=post_ids).values_list(
+        'pk', 'category_id', 'author_id')
+    if rows:
+        post_ids, category_ids, author_ids = zip(*rows)
+        bump_versions(
+            *scopes_for(category_ids, author_ids),
+            *map(post_scope, post_ids)
+        )
+
+
+def _version_key(scope):
+    return f'blog:version:{scope}'
+
+
+def get_versions(*scopes):
+    """Версии областей — время их последнего изменения в наносекундах.
+
+    Если счётчик вытеснен из кеша, версией становится текущее время,
+    поэтому она не совпадёт ни с одной из выданных ранее.
+    """
+    keys = [_version_key(scope) for scope in (GLOBAL_SCOPE, *scopes)]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def get_version_stamp(*scopes):
+    return '.'.join(map(str, get_versions(*scopes)))
+
+
+def bump_versions(*scopes):
+    """Меняет версии областей после фиксации текущей транзакции.
+
+    Читатель, пришедший между сменой версии и фиксацией, сохранил бы
+    под новой версией страницу со старыми данными.
+    """
+    scopes = scopes or (GLOBAL_SCOPE,)
+    transaction.on_commit(lambda: _bump_versions(scopes))
+
+
+def _bump_versions(scopes):
+    now = time.time_ns()
+    for scope in scopes:
+        key = _version_key(scope)
+        version = cache.get(key)
+        cache.set(key, max(now, version + 1) if version else now, None)
+
+
+def page_cache_key(stamp, variant, path):
+    path_hash = hashlib.md5(path.encode()).hexdigest()
+    return f'blog:page:{stamp}:{variant}:{path_hash}'
+
+
+def card_cache_key(post):
+    """Ключ фрагмента карточки публикации.
+
+    Меняется при изменении самой публикации, числа комментариев,
+    имени автора, категории или местоположения.
+    """
+    parts = [
+        post.updated_at.isoformat(),
+        post.comment_count,
+        post.is_published,
+        post.author.username,
+    ]
+    if post.category_id is not None:
+        parts += [post.category.slug, post.category.title,
+                  post.category.is_published]
+    if post.location_id is not None:
+        parts += [post.location.name, post.location.is_published]
+    digest = hashlib.md5(repr(parts).encode()).hexdigest()
+    return f'blog:card:{post.pk}:{digest}'
+
+
+def prefetch_cards(posts):
+    keys = {post: card_cache_key(post) for post in posts}
+    cards = cache.get_many(keys.values())
+    for post, key in keys.items():
+        post.card_cache_key = key
+        post.cached_card = cards.get(key)
+
+
+def make_validators(parts, timestamps):
+    """Валидаторы ETag и Last-Modified (в секундах) для данных страницы."""
+    etag = quote_etag(hashlib.md5(repr(parts).encode()).hexdigest())
+    return etag, int(max(timestamps))
+
+
+def personal_etag(etag, request):
+    """Персональный ETag общей страницы с фрагментами пользователя.
+
+    В ETag пользователя входит и CSRF-секрет: после входа он меняется,
+    и страница с устаревшим токеном в форме не должна отдаваться как 304.
+    """
+    parts = [etag, request.user.pk]
+    if request.user.is_authenticated:
+        # get_token выдаёт каждый раз новую маску; секрет — в CSRF_COOKIE.
+        get_token(request)
+        parts.append(request.META['CSRF_COOKIE'])
+    return quote_etag(hashlib.md5(repr(parts).encode()).hexdigest())
@@ -1,2 +1,32 @@
 STR_MAX_LENGTH: int = 256
 POSTS_ON_PAGE = 10
+PAGINATOR_ON_EACH_SIDE = 2
+PAGINATOR_ON_ENDS = 1
+PAGE_COUNT_CACHE_TIMEOUT = 60 * 60 * 24
+PAGE_CACHE_TIMEOUT = 60 * 10
+CARD_CACHE_TIMEOUT = 60 * 60 * 24
+COMMENTS_ON_PAGE = 50
+EXCERPT_WORDS = 10
+# Производные изображения: размер -> ограничивающая рамка (ширина, высота).
+IMAGE_SIZES = {
+    'thumb': (150, 150),
+    'card': (640, 640),
+    'detail': (1280, 1280),
+}
+# Форматы копий в порядке предпочтения и параметры их сохранения.
+# Формат, который не умеет сохранять установленный Pillow, пропускается;
+# JPEG — запасной вариант для любых браузеров.
+IMAGE_FORMATS = {
+    'avif': {'quality': 60},
+    'webp': {'quality': 80, 'method': 4},
+    'jpeg': {'quality': 85, 'optimize': True, 'progressive': True},
+}
+IMAGE_FALLBACK_FORMAT = 'jpeg'
+# Ширина колонки с публикацией для атрибута sizes.
+IMAGE_SIZES_ATTR = '(max-width: 40rem) 100vw, 40rem'
+IMAGE_VARIANTS_DIR = 'derived_images'
+# Ограничения загружаемых фотографий.
+IMAGE_MAX_UPLOAD_SIZE = 25 * 1024 * 1024
+IMAGE_MAX_PIXELS = 40_000_000
+# Размер части при докачке; сервер принимает части до двух таких размеров.
+UPLOAD_CHUNK_SIZE = 1024 * 1024
@@ -1,19 +1,103 @@
 from django import forms
 from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.template.defaultfilters import filesizeformat
+from PIL import Image
 
-from .models import Comment, Post
+from .consts import IMAGE_MAX_PIXELS, IMAGE_MAX_UPLOAD_SIZE
+from .models import ChunkedUpload, Comment, Post
+from .uploads import ChunkedUploadedFile, discard_upload
+
+
+class LimitedImageField(forms.ImageField):
+    """Проверяет размер файла и число пикселей по заголовку изображения.
+
+    Полная проверка изображения запускается только для файлов,
+    прошедших эти ограничения.
+    """
+
+    default_error_messages = {
+        'too_large': 'Файл больше %(limit)s.',
+        'too_many_pixels': ('Изображение больше %(limit)s мегапикселей, '
+                            'уменьшите его перед загрузкой.'),
+    }
+
+    def to_python(self, data):
+        if data in self.empty_values:
+            return None
+        if getattr(data, 'too_large', False) or (
+                data.size > IMAGE_MAX_UPLOAD_SIZE):
+            raise forms.ValidationError(
+                self.error_messages['too_large'], code='too_large',
+                params={'limit': filesizeformat(IMAGE_MAX_UPLOAD_SIZE)}
+            )
+        try:
+            # Image.open читает только заголовок, пиксели не декодируются.
+            with Image.open(data) as image:
+                width, height = image.size
+        except Exception:
+            width = height = 0
+        finally:
+            data.seek(0)
+        if width * height > IMAGE_MAX_PIXELS:
+            raise forms.ValidationError(
+                self.error_messages['too_many_pixels'],
+                code='too_many_pixels',
+                params={'limit': IMAGE_MAX_PIXELS // 10 ** 6}
+            )
+        return super().to_python(data)
 
 
 class PostForm(forms.ModelForm):
+    # Имя поля с id загрузки по частям, которой заменяется файл image.
+    upload_field_name = 'image_upload'
+
     class Meta:
         model = Post
         fields = ['title', 'text', 'pub_date', 'location', 'category', 'image']
+        field_classes = {
+            'image': LimitedImageField,
+        }
         widgets = {
             'text': forms.Textarea({'cols': '22', 'rows': '2'}),
             'pub_date': forms.DateTimeInput(
                 format=('%Y-%m-%dT%H:%M'), attrs={'type': 'datetime-local'}),
         }
 
+    def __init__(self, *args, user=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.user = user
+        self.upload = None
+
+    def clean(self):
+        cleaned_data = super().clean()
+        upload_id = self.data.get(self.upload_field_name)
+        if not upload_id or self.files.get('image'):
+            return cleaned_data
+        try:
+            self.upload = ChunkedUpload.objects.filter(
+                pk=upload_id, user_id=getattr(self.user, 'pk', None)
+            ).first()
+        except ValidationError:
+            self.upload = None
+        if self.upload is None or not self.upload.is_complete:
+            self.add_error('image', 'Загрузка фотографии не завершена.')
+            return cleaned_data
+        try:
+            cleaned_data['image'] = self.fields['image'].clean(
+                ChunkedUploadedFile(self.upload))
+        except forms.ValidationError as error:
+            self.add_error('image', error)
+        return cleaned_data
+
+    def save(self, commit=True):
+        post = super().save(commit)
+        if commit and self.upload is not None:
+            # Хранилище перемещает файл загрузки на место фотографии,
+            # а если такая фотография уже есть — файл остаётся и удаляется.
+            discard_upload(self.upload)
+        return post
+
 
 class CommentForm(forms.ModelForm):
     class Meta:
@@ -0,0 +1,44 @@
+"""Персональные фрагменты в общих закешированных страницах.
+
+В кеш попадает разметка, общая для всех читателей, а на месте
+персональных фрагментов — меню пользователя, кнопок автора,
+CSRF-токена — остаются метки. Метки заполняются при каждом ответе.
+"""
+import json
+import re
+
+from django.template import Context, Engine
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+from django.utils.safestring import mark_safe
+
+HOLE_TEMPLATE = 'includes/holes/{}.html'
+HOLE_RE = re.compile(rb'<!--hole:([\w-]+)-->')
+
+
+def make_hole(name, **kwargs):
+    payload = json.dumps([name, kwargs], separators=(',', ':'))
+    return mark_safe(
+        f'<!--hole:{urlsafe_base64_encode(payload.encode())}-->')
+
+
+def render_hole(context, name, **kwargs):
+    template = context.template.engine.get_template(HOLE_TEMPLATE.format(name))
+    with context.push(kwargs):
+        return template.render(context)
+
+
+def fill_holes(content, request):
+    """Заполняет метки фрагментами для пользователя запроса."""
+    engine = Engine.get_default()
+    # Контекст-процессоры выполняются один раз на весь ответ.
+    context = Context(autoescape=engine.autoescape)
+    for processor in engine.template_context_processors:
+        context.update(processor(request))
+
+    def fill(match):
+        name, kwargs = json.loads(urlsafe_base64_decode(match[1].decode()))
+        template = engine.get_template(HOLE_TEMPLATE.format(name))
+        with context.push(kwargs):
+            return template.render(context).encode()
+
+    return HOLE_RE.sub(fill, content)
@@ -0,0 +1,189 @@
+"""Производные изображения публикаций.
+
+Для каждой загруженной фотографии строятся уменьшенные копии
+фиксированных размеров (IMAGE_SIZES) в каждом из форматов IMAGE_FORMATS,
+которые поддерживает установленный Pillow. Построение идёт после фиксации
+транзакции в пуле фоновых потоков, а не в запросе пользователя.
+"""
+import logging
+import os
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connections, transaction
+from django.db.models import Count, F
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from .caching import bump_post_versions
+from .consts import (IMAGE_FALLBACK_FORMAT, IMAGE_FORMATS, IMAGE_SIZES,
+                     IMAGE_VARIANTS_DIR)
+from .models import ImageBlob, ImageVariant, Post
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.IMAGE_WORKERS,
+            thread_name_prefix='image-variants'
+        )
+    return _executor
+
+
+@lru_cache(maxsize=None)
+def get_formats():
+    """Форматы копий, которые умеет сохранять установленный Pillow."""
+    Image.init()
+    return tuple(
+        image_format for image_format in IMAGE_FORMATS
+        if image_format.upper() in Image.SAVE
+    )
+
+
+def variant_name(source, size, image_format):
+    root, _ = os.path.splitext(source)
+    extension = 'jpg' if image_format == 'jpeg' else image_format
+    return f'{IMAGE_VARIANTS_DIR}/{size}/{root}.{extension}'
+
+
+def resize(image, box):
+    variant = image.copy()
+    variant.thumbnail(box, Image.LANCZOS)
+    if variant.mode != 'RGB':
+        variant = variant.convert('RGB')
+    return variant
+
+
+def encode(image, image_format):
+    buffer = BytesIO()
+    image.save(buffer, image_format.upper(), **IMAGE_FORMATS[image_format])
+    return ContentFile(buffer.getvalue())
+
+
+def build_variants(source, force=False):
+    """Строит недостающие производные изображения, возвращает их число."""
+    existing = set(ImageVariant.objects.filter(
+        source=source).values_list('size', 'format'))
+    missing = [
+        (size, image_format)
+        for size in IMAGE_SIZES for image_format in get_formats()
+        if force or (size, image_format) not in existing
+    ]
+    if not missing:
+        return 0
+    storage = ImageVariant._meta.get_field('file').storage
+    variants = []
+    with storage.open(source) as file, Image.open(file) as image:
+        image = ImageOps.exif_transpose(image)
+        for size in IMAGE_SIZES:
+            formats = [fmt for missing_size, fmt in missing
+                       if missing_size == size]
+            if not formats:
+                continue
+            resized = resize(image, IMAGE_SIZES[size])
+            for image_format in formats:
+                name = variant_name(source, size, image_format)
+                storage.delete(name)
+                variants.append(ImageVariant(
+                    source=source, size=size, format=image_format,
+                    file=storage.save(name, encode(resized, image_format)),
+                    width=resized.width, height=resized.height
+                ))
+    # Без транзакции: каждая запись короткая и не держит блокировку
+    # базы, пока соседние потоки заняты изображениями.
+    for variant in variants:
+        ImageVariant.objects.filter(
+            source=source, size=variant.size, format=variant.format
+        ).delete()
+    ImageVariant.objects.bulk_create(variants, ignore_conflicts=True)
+    # Карточки и страницы с этим изображением должны перейти на копии.
+    posts = Post.objects.filter(image=source)
+    post_ids = list(posts.values_list('pk', flat=True))
+    posts.update(updated_at=timezone.now())
+    bump_post_versions(post_ids)
+    return len(variants)
+
+
+def acquire_image(name):
+    blob, _ = ImageBlob.objects.get_or_create(name=name)
+    ImageBlob.objects.filter(pk=blob.pk).update(refcount=F('refcount') + 1)
+
+
+def release_image(name):
+    """Снимает ссылку на файл.
+
+    Сам файл и его копии удаляет collect_media_garbage по истечении
+    льготного срока: загрузка с тем же содержимым может как раз сейчас
+    переиспользовать файл.
+    """
+    ImageBlob.objects.filter(name=name, refcount__gt=0).update(
+        refcount=F('refcount') - 1)
+    ImageBlob.objects.filter(name=name, refcount=0).delete()
+
+
+def recount_image_blobs():
+    """Пересчитывает ссылки на файлы фотографий по публикациям."""
+    counts = Post.objects.exclude(image='').order_by().values(
+        'image').annotate(refcount=Count('pk'))
+    with transaction.atomic():
+        ImageBlob.objects.all().delete()
+        ImageBlob.objects.bulk_create(
+            ImageBlob(name=row['image'], refcount=row['refcount'])
+            for row in counts
+        )
+
+
+def _build_in_worker(source):
+    try:
+        build_variants(source)
+    except Exception:
+        logger.exception('Не удалось построить копии изображения %s', source)
+    finally:
+        connections.close_all()
+
+
+def schedule_variants(source):
+    """Ставит построение копий в очередь фонового пула.
+
+    При IMAGE_WORKERS = 0 копии строятся сразу, в текущем потоке.
+    """
+    if settings.IMAGE_WORKERS:
+        get_executor().submit(_build_in_worker, source)
+        return
+    try:
+        build_variants(source)
+    except Exception:
+        logger.exception('Не удалось построить копии изображения %s', source)
+
+
+def prefetch_variants(posts):
+    """Загружает копии изображений публикаций одним запросом."""
+    posts = [post for post in posts if post.image]
+    variants = defaultdict(dict)
+    for variant in ImageVariant.objects.filter(
+            source__in={post.image.name for post in posts}):
+        variants[variant.source][variant.size, variant.format] = variant
+    for post in posts:
+        post.image_variants = variants[post.image.name]
+
+
+def get_variants(post):
+    """Копии изображения публикации по ключу (размер, формат)."""
+    if not post.image:
+        return {}
+    if not hasattr(post, 'image_variants'):
+        prefetch_variants([post])
+    return post.image_variants
+
+
+def get_variant(post, size, image_format=IMAGE_FALLBACK_FORMAT):
+    return get_variants(post).get((size, image_format))
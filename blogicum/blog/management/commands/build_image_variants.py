@@ -0,0 +1,59 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from blog.images import build_variants
+from blog.models import Post
+
+
+def _build(source, force):
+    try:
+        return source, build_variants(source, force=force), None
+    except Exception as error:
+        return source, 0, error
+
+
+def _build_in_thread(source, force):
+    try:
+        return _build(source, force)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = ('Строит недостающие копии изображений публикаций '
+            'в несколько потоков.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 1,
+            help=('Сколько изображений обрабатывать одновременно, '
+                  '1 — без фоновых потоков.')
+        )
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Перестроить и уже существующие копии.'
+        )
+
+    def handle(self, *args, **options):
+        sources = Post.objects.exclude(image='').order_by(
+            'image').values_list('image', flat=True).distinct()
+        workers, force = options['workers'], options['force']
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(
+                    partial(_build_in_thread, force=force), sources))
+        else:
+            results = map(partial(_build, force=force), sources)
+        built = failed = 0
+        for source, count, error in results:
+            if error is not None:
+                failed += 1
+                self.stderr.write(f'{source}: {error}')
+            built += count
+        self.stdout.write(self.style.SUCCESS(
+            f'Построено копий: {built}, ошибок: {failed}.'
+        ))
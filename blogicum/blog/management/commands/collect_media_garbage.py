@@ -0,0 +1,146 @@
+import hashlib
+import os
+import shutil
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.consts import IMAGE_VARIANTS_DIR
+from blog.models import ChunkedUpload, ImageBlob, ImageVariant, Post
+from blog.uploads import discard_upload
+
+ITERATOR_CHUNK_SIZE = 2000
+
+
+def fingerprint(name):
+    """Восьмибайтовый отпечаток имени файла для множества ссылок.
+
+    Совпадение отпечатков лишь сохраняет лишний файл, поэтому коллизии
+    безопасны.
+    """
+    return int.from_bytes(
+        hashlib.blake2b(name.encode(), digest_size=8).digest(), 'big')
+
+
+def walk_files(path):
+    """Файлы каталога и его подкаталогов без построения списка целиком."""
+    try:
+        entries = os.scandir(path)
+    except FileNotFoundError:
+        return
+    with entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from walk_files(entry.path)
+            elif entry.is_file(follow_symlinks=False):
+                yield entry
+
+
+class Command(BaseCommand):
+    help = ('Удаляет фотографии и их копии, на которые не ссылается ни одна '
+            'публикация, а также брошенные загрузки по частям. Файлы моложе '
+            'льготного срока не трогаются, так что команду можно запускать, '
+            'не останавливая загрузки.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace-hours', type=float, default=24,
+            help='Не трогать файлы, изменённые за это число часов.'
+        )
+        parser.add_argument(
+            '--quarantine', metavar='DIR',
+            help='Переносить файлы в этот каталог вместо удаления.'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только посчитать лишние файлы, ничего не меняя.'
+        )
+
+    def handle(self, *args, **options):
+        self.options = options
+        grace = options['grace_hours'] * 3600
+        self.cutoff = time.time() - grace
+        self.storage = Post._meta.get_field('image').storage
+        referenced = self.referenced()
+        collected = freed = 0
+        for directory in (
+                Post._meta.get_field('image').upload_to, IMAGE_VARIANTS_DIR):
+            for entry in walk_files(self.storage.path(directory)):
+                name = os.path.relpath(
+                    entry.path, settings.MEDIA_ROOT).replace(os.sep, '/')
+                if fingerprint(name) in referenced:
+                    continue
+                stat = entry.stat()
+                if stat.st_mtime < self.cutoff and self.collect(name):
+                    collected += 1
+                    freed += stat.st_size
+        uploads = self.collect_uploads(timezone.now() - timedelta(
+            seconds=grace))
+        self.stdout.write(self.style.SUCCESS(
+            f'Лишних файлов: {collected} ({freed} байт), '
+            f'брошенных загрузок: {uploads}.'
+        ))
+
+    def referenced(self):
+        # Из базы читаются только имена, поток за потоком, а в памяти
+        # остаются восьмибайтовые отпечатки.
+        images = {
+            fingerprint(name) for name in Post.objects.exclude(
+                image='').values_list('image', flat=True).iterator(
+                    chunk_size=ITERATOR_CHUNK_SIZE)
+        }
+        # Копии нужны, только пока жив их исходный файл.
+        variants = {
+            fingerprint(file) for source, file
+            in ImageVariant.objects.values_list('source', 'file').iterator(
+                chunk_size=ITERATOR_CHUNK_SIZE)
+            if fingerprint(source) in images
+        }
+        return images | variants
+
+    def is_referenced(self, name):
+        return (
+            Post.objects.filter(image=name).exists()
+            or ImageBlob.objects.filter(name=name, refcount__gt=0).exists()
+            or ImageVariant.objects.filter(
+                file=name, source__in=Post.objects.values('image')).exists()
+        )
+
+    def collect(self, name):
+        """Удаляет или убирает в карантин файл, если он всё ещё лишний.
+
+        Ссылка могла появиться после чтения базы: новая загрузка с тем
+        же содержимым переиспользует файл и обновляет время его изменения.
+        """
+        if self.is_referenced(name):
+            return False
+        path = self.storage.path(name)
+        try:
+            if os.stat(path).st_mtime >= self.cutoff:
+                return False
+        except FileNotFoundError:
+            return False
+        if self.options['dry_run']:
+            return True
+        if self.options['quarantine']:
+            target = os.path.join(self.options['quarantine'], name)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.move(path, target)
+        else:
+            os.remove(path)
+        ImageVariant.objects.filter(file=name).delete()
+        ImageBlob.objects.filter(name=name, refcount=0).delete()
+        return True
+
+    def collect_uploads(self, cutoff):
+        stale = ChunkedUpload.objects.filter(created_at__lt=cutoff)
+        if self.options['dry_run']:
+            return stale.count()
+        count = 0
+        for upload in stale.iterator(chunk_size=ITERATOR_CHUNK_SIZE):
+            discard_upload(upload)
+            count += 1
+        return count
@@ -0,0 +1,72 @@
+import os
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from blog.caching import bump_post_versions
+from blog.images import recount_image_blobs
+from blog.models import ImageVariant, Post
+from blog.storage import HASH_NAME_RE, content_hash, content_name
+
+
+class Command(BaseCommand):
+    help = ('Переименовывает фотографии публикаций по хешу содержимого '
+            'и удаляет дубликаты. Команду можно прервать и запустить '
+            'снова: уже обработанные файлы пропускаются.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только посчитать дубликаты, ничего не меняя.'
+        )
+
+    def handle(self, *args, **options):
+        field = Post._meta.get_field('image')
+        self.storage = field.storage
+        root = self.storage.path(field.upload_to)
+        renamed = merged = 0
+        if os.path.isdir(root):
+            with os.scandir(root) as entries:
+                for entry in entries:
+                    if not entry.is_file() or HASH_NAME_RE.fullmatch(
+                            entry.name):
+                        continue
+                    old = f'{field.upload_to}/{entry.name}'
+                    with open(entry.path, 'rb') as file:
+                        new = content_name(old, content_hash(file))
+                    duplicate = self.storage.exists(new)
+                    if not options['dry_run']:
+                        self.move(old, new)
+                    merged += duplicate
+                    renamed += not duplicate
+        if not options['dry_run']:
+            recount_image_blobs()
+        self.stdout.write(self.style.SUCCESS(
+            f'Переименовано файлов: {renamed}, '
+            f'удалено дубликатов: {merged}.'
+        ))
+
+    def move(self, old, new):
+        # Сначала ссылка под новым именем, затем публикации, и только
+        # после фиксации — удаление старого имени. Прерванный запуск
+        # оставляет оба имени, и повторный доводит перенос до конца.
+        if not self.storage.exists(new):
+            os.makedirs(
+                os.path.dirname(self.storage.path(new)), exist_ok=True)
+            os.link(self.storage.path(old), self.storage.path(new))
+        with transaction.atomic():
+            posts = Post.objects.filter(image=old)
+            post_ids = list(posts.values_list('pk', flat=True))
+            posts.update(image=new, updated_at=timezone.now())
+            variants = ImageVariant.objects.filter(source=old)
+            stale_files = []
+            if ImageVariant.objects.filter(source=new).exists():
+                stale_files = [variant.file for variant in variants]
+                variants.delete()
+            else:
+                variants.update(source=new)
+        bump_post_versions(post_ids)
+        for file in stale_files:
+            file.delete(save=False)
+        self.storage.delete(old)
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from blog.publication import advance_publication
+
+
+class Command(BaseCommand):
+    help = ('Публикует отложенные посты, время которых наступило. '
+            'Предназначена для запуска по расписанию.')
+
+    def handle(self, *args, **options):
+        published = advance_publication()
+        self.stdout.write(self.style.SUCCESS(
+            f'Опубликовано отложенных постов: {published}.'
+        ))
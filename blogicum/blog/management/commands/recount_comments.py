@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from blog.caching import bump_post_versions
+from blog.models import Comment, Post
+
+CHUNK_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики комментариев у публикаций пачками.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=CHUNK_SIZE,
+            help='Сколько публикаций пересчитывать за один запрос.'
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        actual_count = Coalesce(Subquery(
+            Comment.objects.filter(post=OuterRef('pk')).order_by().values(
+                'post').annotate(total=Count('pk')).values('total')
+        ), 0)
+        last_pk = 0
+        checked = fixed = 0
+        while True:
+            pks = list(
+                Post.objects.filter(pk__gt=last_pk).order_by('pk').values_list(
+                    'pk', flat=True)[:chunk_size]
+            )
+            if not pks:
+                break
+            with transaction.atomic():
+                drifted = list(Post.objects.filter(pk__in=pks).annotate(
+                    actual_count=actual_count
+                ).exclude(
+                    comment_count=F('actual_count')
+                ).values_list('pk', flat=True))
+                Post.objects.filter(pk__in=drifted).update(
+                    comment_count=actual_count, updated_at=timezone.now())
+                # Страницы с устаревшими счётчиками должны обновиться.
+                bump_post_versions(drifted)
+            fixed += len(drifted)
+            checked += len(pks)
+            last_pk = pks[-1]
+        self.stdout.write(self.style.SUCCESS(
+            f'Проверено публикаций: {checked}, исправлено: {fixed}.'
+        ))
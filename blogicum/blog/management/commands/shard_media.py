@@ -0,0 +1,102 @@
+import os
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Case, CharField, F, Value, When
+from django.utils import timezone
+
+from blog.caching import bump_post_versions
+from blog.images import variant_name
+from blog.models import ImageBlob, ImageVariant, Post
+from blog.storage import is_sharded, sharded_name
+
+
+def replace(queryset, field, names):
+    """Одним запросом заменяет значения field по словарю старое → новое."""
+    return queryset.filter(**{f'{field}__in': list(names)}).update(**{
+        field: Case(
+            *(When(**{field: old}, then=Value(new))
+              for old, new in names.items()),
+            default=F(field),
+            output_field=CharField()
+        )
+    })
+
+
+class Command(BaseCommand):
+    help = ('Переносит фотографии публикаций в каталоги по префиксам хеша. '
+            'Работает пачками в коротких транзакциях; прерванный запуск '
+            'можно повторить, перенесённые файлы пропускаются.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Сколько файлов переносить за одну транзакцию.'
+        )
+
+    def handle(self, *args, **options):
+        self.storage = Post._meta.get_field('image').storage
+        self.variant_storage = ImageVariant._meta.get_field('file').storage
+        names = Post.objects.exclude(image='').order_by(
+            'image').values_list('image', flat=True).distinct()
+        moved = missing = 0
+        last = ''
+        while True:
+            batch = list(names.filter(image__gt=last)[:options['batch_size']])
+            if not batch:
+                break
+            last = batch[-1]
+            renames = {}
+            for name in batch:
+                if is_sharded(name):
+                    continue
+                if self.link(self.storage, name, sharded_name(name)):
+                    renames[name] = sharded_name(name)
+                else:
+                    missing += 1
+                    self.stderr.write(f'{name}: файл не найден')
+            if renames:
+                self.move_batch(renames)
+                moved += len(renames)
+                self.stdout.write(f'Перенесено файлов: {moved}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Перенесено файлов: {moved}, не найдено: {missing}.'
+        ))
+
+    def link(self, storage, old, new):
+        """Делает файл доступным под новым именем, не трогая старое.
+
+        Если прошлый запуск прервался после переноса, файл уже лежит
+        под новым именем.
+        """
+        if storage.exists(new):
+            return True
+        if not storage.exists(old):
+            return False
+        os.makedirs(os.path.dirname(storage.path(new)), exist_ok=True)
+        os.link(storage.path(old), storage.path(new))
+        return True
+
+    def move_batch(self, renames):
+        # Новые имена появляются до транзакции, старые удаляются после
+        # неё: в любой момент каждая запись указывает на существующий файл.
+        variant_files = {}
+        for variant in ImageVariant.objects.filter(source__in=list(renames)):
+            new = variant_name(
+                renames[variant.source], variant.size, variant.format)
+            if self.link(self.variant_storage, variant.file.name, new):
+                variant_files[variant.file.name] = new
+        with transaction.atomic():
+            posts = Post.objects.filter(image__in=list(renames))
+            post_ids = list(posts.values_list('pk', flat=True))
+            replace(Post.objects.all(), 'image', renames)
+            Post.objects.filter(pk__in=post_ids).update(
+                updated_at=timezone.now())
+            replace(ImageVariant.objects.all(), 'source', renames)
+            replace(ImageVariant.objects.all(), 'file', variant_files)
+            replace(ImageBlob.objects.all(), 'name', renames)
+        bump_post_versions(post_ids)
+        for old in renames:
+            self.storage.delete(old)
+        for old in variant_files:
+            self.variant_storage.delete(old)
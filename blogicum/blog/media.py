@@ -0,0 +1,70 @@
+"""Отдача загруженных файлов.
+
+Файл либо передаётся фронтовому серверу заголовком X-Accel-Redirect
+(nginx) или X-Sendfile (Apache, lighttpd), либо отдаётся из Django
+через core.files с поддержкой диапазонов байт и условных запросов.
+"""
+import posixpath
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.views.decorators.http import require_safe
+
+from core.files import file_etag, file_response, resolve, set_validators
+
+from .consts import IMAGE_VARIANTS_DIR
+from .storage import HASH_NAME_RE
+
+# Имена по хешу содержимого не меняют содержимого: кешируются на год.
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+MEDIA_MAX_AGE = 3600
+
+
+def is_immutable(path):
+    return (
+        not path.startswith(f'{IMAGE_VARIANTS_DIR}/')
+        and HASH_NAME_RE.fullmatch(posixpath.basename(path)) is not None
+    )
+
+
+def offload(path, full_path):
+    """Ответ, тело которого отдаст фронтовой сервер, или None."""
+    backend = settings.MEDIA_SENDFILE
+    if backend == 'x-accel-redirect':
+        response = HttpResponse()
+        response['X-Accel-Redirect'] = quote(
+            settings.MEDIA_ACCEL_PREFIX + path)
+    elif backend == 'x-sendfile':
+        response = HttpResponse()
+        response['X-Sendfile'] = full_path
+    else:
+        return None
+    # Тип файла и диапазоны определит сам фронтовой сервер.
+    del response['Content-Type']
+    return response
+
+
+@require_safe
+def serve(request, path):
+    """Файл из MEDIA_ROOT с валидаторами и кешированием."""
+    path, full_path, stat = resolve(settings.MEDIA_ROOT, path)
+    etag = file_etag(stat)
+    last_modified = int(stat.st_mtime)
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = (
+            offload(path, full_path)
+            or file_response(request, full_path, stat, etag, last_modified)
+        )
+    set_validators(response, etag, last_modified)
+    response['Accept-Ranges'] = 'bytes'
+    response['X-Content-Type-Options'] = 'nosniff'
+    if is_immutable(path):
+        patch_cache_control(
+            response, public=True, max_age=IMMUTABLE_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(response, public=True, max_age=MEDIA_MAX_AGE)
+    return response
@@ -0,0 +1,32 @@
+# Generated by Django 3.2.16 on 2026-10-18 04:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0022_post_excerpt'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageVariant',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=256, verbose_name='Исходное изображение')),
+                ('size', models.CharField(choices=[('thumb', 'thumb'), ('card', 'card'), ('detail', 'detail')], max_length=16, verbose_name='Размер')),
+                ('file', models.ImageField(max_length=256, upload_to='derived_images', verbose_name='Файл')),
+                ('width', models.PositiveIntegerField(verbose_name='Ширина')),
+                ('height', models.PositiveIntegerField(verbose_name='Высота')),
+            ],
+            options={
+                'verbose_name': 'производное изображение',
+                'verbose_name_plural': 'Производные изображения',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='imagevariant',
+            constraint=models.UniqueConstraint(fields=('source', 'size'), name='image_variant_source_size_uniq'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 3.2.16 on 2026-10-18 04:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0025_image_blobs'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='imagevariant',
+            name='image_variant_source_size_uniq',
+        ),
+        migrations.AddField(
+            model_name='imagevariant',
+            name='format',
+            field=models.CharField(choices=[('avif', 'avif'), ('webp', 'webp'), ('jpeg', 'jpeg')], default='jpeg', max_length=8, verbose_name='Формат'),
+        ),
+        migrations.AddConstraint(
+            model_name='imagevariant',
+            constraint=models.UniqueConstraint(fields=('source', 'size', 'format'), name='image_variant_source_size_format_uniq'),
+        ),
+    ]
@@ -1,16 +1,195 @@
+from django.core.cache import cache
+from django.core.paginator import InvalidPage
+from django.http import Http404, HttpResponse
 from django.shortcuts import redirect
+from django.utils.cache import get_conditional_response
 
+from core.files import set_validators
+
+from .caching import (count_scope, get_version_stamp, get_versions,
+                      make_validators, page_cache_key, personal_etag,
+                      prefetch_cards)
+from .consts import PAGE_CACHE_TIMEOUT, UPLOAD_CHUNK_SIZE
 from .forms import PostForm
+from .holes import fill_holes
+from .images import prefetch_variants
 from .models import Post
+from .paginators import CachedCountPaginator, KeysetPaginator
+from .publication import publish_if_due
 
 
 class PostMixin:
     model = Post
     form_class = PostForm
 
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        kwargs['user'] = self.request.user
+        return kwargs
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['upload_chunk_size'] = UPLOAD_CHUNK_SIZE
+        return context
+
 
 class PostUpdateMixin:
     def dispatch(self, request, *args, **kwargs):
         if self.get_object().author != self.request.user:
             return redirect('blog:post_detail', kwargs['post_id'])
         return super().dispatch(request, *args, **kwargs)
+
+
+class PublishDuePostsMixin:
+    def dispatch(self, request, *args, **kwargs):
+        publish_if_due()
+        return super().dispatch(request, *args, **kwargs)
+
+
+class KeysetPaginationMixin:
+    """Курсорная пагинация; старые ссылки вида ?page=N продолжают работать."""
+
+    cursor_kwarg = 'cursor'
+    # Отключается там, где старых ссылок с номером страницы нет.
+    allow_page_numbers = True
+
+    def paginate_queryset(self, queryset, page_size):
+        if self.allow_page_numbers and (
+                self.page_kwarg in self.kwargs
+                or self.page_kwarg in self.request.GET):
+            return super().paginate_queryset(queryset, page_size)
+        paginator = KeysetPaginator(queryset, page_size, self.get_ordering())
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidPage as error:
+            raise Http404(str(error))
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
+class PageCacheMixin:
+    """Кеширование страницы в пределах версии её областей кеша.
+
+    Кешируется общая для всех читателей разметка, персональные
+    фрагменты заполняются при каждом ответе (см. holes.py).
+
+    ETag и Last-Modified считаются в get_validators подкласса по уже
+    полученным из базы данным страницы; если они совпали с присланными
+    клиентом, возвращается 304 без отрисовки шаблона.
+    """
+
+    cache_scopes = ()
+
+    def dispatch(self, request, *args, **kwargs):
+        if not self.is_page_cacheable():
+            return super().dispatch(request, *args, **kwargs)
+        key = page_cache_key(
+            self.get_cache_stamp(),
+            self.get_cache_variant(),
+            request.get_full_path()
+        )
+        entry = cache.get(key)
+        if entry is not None:
+            return self.get_cached_response(entry)
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == 200 and hasattr(
+                response, 'add_post_render_callback'):
+            response.add_post_render_callback(
+                lambda rendered: self.store_response(key, rendered))
+        return response
+
+    def get_cached_response(self, entry):
+        etag = personal_etag(entry['etag'], self.request)
+        response = get_conditional_response(
+            self.request, etag=etag, last_modified=entry['last_modified'])
+        if response is None:
+            response = HttpResponse(
+                fill_holes(entry['content'], self.request),
+                content_type=entry['content_type']
+            )
+        return set_validators(response, etag, entry['last_modified'])
+
+    def render_to_response(self, context, **response_kwargs):
+        self.validators = self.get_validators(context)
+        etag, last_modified = self.validators
+        etag = personal_etag(etag, self.request)
+        response = get_conditional_response(
+            self.request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = super().render_to_response(context, **response_kwargs)
+        return set_validators(response, etag, last_modified)
+
+    def store_response(self, key, response):
+        if self.is_response_cacheable():
+            etag, last_modified = self.validators
+            cache.set(key, {
+                'content': response.content,
+                'content_type': response['Content-Type'],
+                'etag': etag,
+                'last_modified': last_modified,
+            }, PAGE_CACHE_TIMEOUT)
+        response.content = fill_holes(response.content, self.request)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['punch_holes'] = self.is_page_cacheable()
+        return context
+
+    def is_page_cacheable(self):
+        return self.request.method in ('GET', 'HEAD')
+
+    def is_response_cacheable(self):
+        return True
+
+    def get_cache_scopes(self):
+        return self.cache_scopes
+
+    def get_cache_variant(self):
+        if self.request.user.is_authenticated:
+            return 'member'
+        return 'public'
+
+    def get_cache_stamp(self):
+        return get_version_stamp(*self.get_cache_scopes())
+
+
+class FeedCacheMixin(PageCacheMixin):
+    """Кеширование ленты: страницы, карточки публикаций и число записей."""
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        page = context['page_obj'] or ()
+        prefetch_cards(page)
+        prefetch_variants(
+            post for post in page if post.cached_card is None)
+        return context
+
+    def get_validators(self, context):
+        page = context['page_obj']
+        versions = get_versions(*self.get_cache_scopes())
+        return make_validators(
+            [
+                self.get_cache_variant(),
+                versions,
+                [(post.pk, post.updated_at, post.comment_count)
+                 for post in page],
+                page.has_previous(),
+                page.has_next(),
+                getattr(page, 'number', None),
+            ],
+            [version / 10 ** 9 for version in versions]
+            + [post.updated_at.timestamp() for post in page]
+        )
+
+    def get_paginator(self, queryset, per_page, orphans=0,
+                      allow_empty_first_page=True, **kwargs):
+        scopes = self.get_cache_scopes()
+        count_cache_key = 'blog:count:{}:{}:{}'.format(
+            ':'.join(scopes),
+            self.get_cache_variant(),
+            get_version_stamp(*map(count_scope, scopes)),
+        )
+        return CachedCountPaginator(
+            queryset, per_page, orphans=orphans,
+            allow_empty_first_page=allow_empty_first_page,
+            count_cache_key=count_cache_key, **kwargs
+        )
@@ -1,8 +1,17 @@
-from core.models import CreatedAtModel, PublishedModel
+import uuid
+from pathlib import Path
+
+from core.models import CreatedAtModel, PublishedModel, UpdatedAtModel
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.db.models import DEFERRED
+from django.utils import timezone
+from django.utils.text import Truncator
 
-from .consts import STR_MAX_LENGTH
+from .consts import (EXCERPT_WORDS, IMAGE_FALLBACK_FORMAT, IMAGE_FORMATS,
+                     IMAGE_SIZES, IMAGE_VARIANTS_DIR, STR_MAX_LENGTH)
+from .storage import ContentAddressedStorage
 
 User = get_user_model()
 
@@ -26,6 +35,12 @@ class Category(PublishedModel, CreatedAtModel):
         verbose_name = "категория"
         verbose_name_plural = "Категории"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_is_published = instance.__dict__.get('is_published')
+        return instance
+
     def __str__(self):
         return (self.title[:20] + '...' if len(self.title) > 20
                 else self.title)
@@ -45,7 +60,7 @@ class Location(PublishedModel, CreatedAtModel):
         return self.name
 
 
-class Post(PublishedModel, CreatedAtModel):
+class Post(PublishedModel, CreatedAtModel, UpdatedAtModel):
     title = models.CharField(
         max_length=STR_MAX_LENGTH,
         verbose_name="Заголовок"
@@ -62,6 +77,7 @@ class Post(PublishedModel, CreatedAtModel):
         User,
         verbose_name="Автор публикации",
         on_delete=models.CASCADE,
+        db_index=False
     )
     location = models.ForeignKey(
         Location,
@@ -79,18 +95,98 @@ class Post(PublishedModel, CreatedAtModel):
     image = models.ImageField(
         verbose_name='Фото',
         upload_to='posts_images',
+        storage=ContentAddressedStorage(),
         blank=True
     )
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Количество комментариев"
+    )
+    is_visible = models.BooleanField(
+        default=False,
+        editable=False,
+        verbose_name="Отображается в ленте",
+        help_text=("Пост опубликован, его категория опубликована "
+                   "и время публикации наступило.")
+    )
+    excerpt = models.TextField(
+        blank=True,
+        editable=False,
+        verbose_name="Начало текста",
+        help_text="Первые слова текста для карточки в ленте."
+    )
 
     class Meta:
         verbose_name = "публикация"
         verbose_name_plural = "Публикации"
         ordering = ('-pub_date',)
         default_related_name = 'posts'
+        indexes = (
+            models.Index(
+                fields=('pub_date', 'id'),
+                name='post_pub_date_id_idx'
+            ),
+            models.Index(
+                fields=('pub_date', 'id'),
+                name='post_visible_pub_date_idx',
+                condition=models.Q(is_visible=True)
+            ),
+            models.Index(
+                fields=('category', 'pub_date', 'id'),
+                name='post_visible_category_idx',
+                condition=models.Q(is_visible=True)
+            ),
+            models.Index(
+                fields=('author', 'pub_date', 'id'),
+                name='post_visible_author_idx',
+                condition=models.Q(is_visible=True)
+            ),
+            models.Index(
+                fields=('author', 'pub_date', 'id'),
+                name='post_author_pub_date_idx'
+            ),
+            models.Index(
+                fields=('pub_date',),
+                name='post_pending_pub_date_idx',
+                condition=models.Q(is_visible=False, is_published=True)
+            ),
+        )
 
     def __str__(self):
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_category_id = instance.__dict__.get('category_id')
+        instance._loaded_author_id = instance.__dict__.get('author_id')
+        instance._loaded_image = instance.__dict__.get('image', DEFERRED)
+        return instance
+
+    def get_visibility(self, now=None):
+        return bool(
+            self.is_published
+            and self.category_id is not None
+            and self.category.is_published
+            and self.pub_date < (now or timezone.now())
+        )
+
+    def get_excerpt(self):
+        return Truncator(self.text).words(EXCERPT_WORDS, truncate=' …')
+
+    def save(self, *args, **kwargs):
+        self.is_visible = self.get_visibility()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'text' in update_fields:
+            self.excerpt = self.get_excerpt()
+        if update_fields is not None:
+            update_fields = {*update_fields, 'is_visible'}
+            if 'text' in update_fields:
+                update_fields.add('excerpt')
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
+
 
 class Comment(PublishedModel, CreatedAtModel):
     text = models.TextField(
@@ -100,7 +196,8 @@ class Comment(PublishedModel, CreatedAtModel):
         Post,
         on_delete=models.CASCADE,
         related_name='comments',
-        blank=True
+        blank=True,
+        db_index=False
     )
     author = models.ForeignKey(
         User,
@@ -112,10 +209,114 @@ class Comment(PublishedModel, CreatedAtModel):
         verbose_name = "комментарий"
         verbose_name_plural = "Комментарии"
         ordering = ('created_at',)
+        indexes = (
+            models.Index(
+                fields=('post', 'created_at', 'id'),
+                name='comment_post_created_at_idx'
+            ),
+        )
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_post_id = instance.__dict__.get('post_id')
+        return instance
 
     def __str__(self):
-        return (
-            f'post_id: {self.post}',
-            f'user_id: {self.author}',
-            f'text: {self.text}'
+        return f'{self.author} к «{self.post}»: {self.text[:20]}'
+
+
+class ImageVariant(models.Model):
+    source = models.CharField(
+        max_length=STR_MAX_LENGTH,
+        verbose_name="Исходное изображение"
+    )
+    size = models.CharField(
+        max_length=16,
+        choices=[(size, size) for size in IMAGE_SIZES],
+        verbose_name="Размер"
+    )
+    format = models.CharField(
+        max_length=8,
+        choices=[(image_format, image_format)
+                 for image_format in IMAGE_FORMATS],
+        default=IMAGE_FALLBACK_FORMAT,
+        verbose_name="Формат"
+    )
+    file = models.ImageField(
+        upload_to=IMAGE_VARIANTS_DIR,
+        max_length=STR_MAX_LENGTH,
+        verbose_name="Файл"
+    )
+    width = models.PositiveIntegerField(verbose_name="Ширина")
+    height = models.PositiveIntegerField(verbose_name="Высота")
+
+    class Meta:
+        verbose_name = "производное изображение"
+        verbose_name_plural = "Производные изображения"
+        constraints = (
+            models.UniqueConstraint(
+                fields=('source', 'size', 'format'),
+                name='image_variant_source_size_format_uniq'
+            ),
         )
+
+    def __str__(self):
+        return f'{self.source} ({self.size}, {self.format})'
+
+
+class ImageBlob(CreatedAtModel):
+    """Файл фотографии и число публикаций, которые на него ссылаются."""
+
+    name = models.CharField(
+        max_length=STR_MAX_LENGTH,
+        unique=True,
+        verbose_name="Файл"
+    )
+    refcount = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Число публикаций"
+    )
+
+    class Meta:
+        verbose_name = "файл фотографии"
+        verbose_name_plural = "Файлы фотографий"
+
+    def __str__(self):
+        return f'{self.name} ({self.refcount})'
+
+
+class ChunkedUpload(CreatedAtModel):
+    """Загрузка фотографии по частям, которую можно продолжить."""
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='chunked_uploads',
+        verbose_name="Пользователь"
+    )
+    filename = models.CharField(
+        max_length=STR_MAX_LENGTH,
+        verbose_name="Имя файла"
+    )
+    size = models.PositiveBigIntegerField(verbose_name="Размер")
+    offset = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name="Получено байт"
+    )
+
+    class Meta:
+        verbose_name = "загрузка по частям"
+        verbose_name_plural = "Загрузки по частям"
+
+    def __str__(self):
+        return f'{self.filename} ({self.offset}/{self.size})'
+
+    @property
+    def path(self):
+        return Path(settings.CHUNKED_UPLOAD_ROOT) / f'{self.pk}.part'
+
+    @property
+    def is_complete(self):
+        return self.offset == self.size
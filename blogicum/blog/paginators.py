@@ -0,0 +1,165 @@
+import json
+from collections.abc import Sequence
+
+from django.core.cache import cache
+from django.core.paginator import InvalidPage, Page, Paginator
+from django.db.models import Q
+from django.utils.encoding import force_str
+from django.utils.functional import cached_property
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+
+from .consts import (PAGE_COUNT_CACHE_TIMEOUT, PAGINATOR_ON_EACH_SIDE,
+                     PAGINATOR_ON_ENDS)
+
+
+class InvalidCursor(InvalidPage):
+    pass
+
+
+class ElidedPage(Page):
+    @property
+    def elided_page_range(self):
+        return self.paginator.get_elided_page_range(
+            self.number,
+            on_each_side=PAGINATOR_ON_EACH_SIDE,
+            on_ends=PAGINATOR_ON_ENDS
+        )
+
+
+class CachedCountPaginator(Paginator):
+    """Нумерованная пагинация с закешированным числом записей."""
+
+    def __init__(self, *args, count_cache_key=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.count_cache_key = count_cache_key
+
+    @cached_property
+    def count(self):
+        if self.count_cache_key is None:
+            return Paginator.count.func(self)
+        count = cache.get(self.count_cache_key)
+        if count is None:
+            count = Paginator.count.func(self)
+            cache.set(self.count_cache_key, count, PAGE_COUNT_CACHE_TIMEOUT)
+        return count
+
+    def _get_page(self, *args, **kwargs):
+        return ElidedPage(*args, **kwargs)
+
+
+class KeysetPage(Sequence):
+    def __init__(self, object_list, paginator,
+                 next_cursor=None, previous_cursor=None,
+                 has_previous=False):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return f'<Keyset page of {len(self)} items>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    @property
+    def is_keyset(self):
+        return True
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """Пагинация по ключу сортировки вместо OFFSET.
+
+    Каждая страница — один диапазонный запрос по индексу, курсоры
+    кодируют значения полей сортировки крайней записи страницы.
+    Все поля сортировки должны иметь одно направление, последнее
+    поле должно быть уникальным.
+    """
+
+    def __init__(self, object_list, per_page, ordering):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.descending = self.ordering[0].startswith('-')
+        self.fields = tuple(name.lstrip('-') for name in self.ordering)
+
+    def page(self, cursor=None):
+        backwards = False
+        queryset = self.object_list
+        if cursor:
+            backwards, values = self.decode_cursor(cursor)
+            queryset = queryset.filter(self._seek(values, backwards))
+        ordering = self.ordering
+        if backwards:
+            ordering = tuple(
+                name[1:] if name.startswith('-') else f'-{name}'
+                for name in ordering
+            )
+        items = list(queryset.order_by(*ordering)[:self.per_page + 1])
+        has_more = len(items) > self.per_page
+        items = items[:self.per_page]
+        if backwards:
+            items.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, bool(cursor)
+        return KeysetPage(
+            items,
+            self,
+            next_cursor=(self.encode_cursor(items[-1])
+                         if has_next and items else None),
+            previous_cursor=(self.encode_cursor(items[0], backwards=True)
+                             if has_previous and items else None),
+            has_previous=has_previous,
+        )
+
+    def encode_cursor(self, obj, backwards=False):
+        opts = obj._meta
+        values = [
+            opts.get_field(name).value_to_string(obj) for name in self.fields
+        ]
+        payload = json.dumps([int(backwards), *values], separators=(',', ':'))
+        return urlsafe_base64_encode(payload.encode())
+
+    def decode_cursor(self, cursor):
+        opts = self.object_list.model._meta
+        try:
+            backwards, *raw_values = json.loads(
+                force_str(urlsafe_base64_decode(cursor)))
+            if len(raw_values) != len(self.fields):
+                raise ValueError
+            values = [
+                opts.get_field(name).to_python(value)
+                for name, value in zip(self.fields, raw_values)
+            ]
+        except Exception:
+            raise InvalidCursor('Некорректный курсор страницы')
+        if any(value is None for value in values):
+            raise InvalidCursor('Некорректный курсор страницы')
+        return bool(backwards), values
+
+    def _seek(self, values, backwards):
+        # Ведущее нестрогое условие задаёт границу диапазона по индексу,
+        # остальные отсекают уже показанные записи с равным ключом.
+        lookup = 'gt' if self.descending == backwards else 'lt'
+        first, *rest = zip(self.fields, values)
+        condition = Q(**{f'{first[0]}__{lookup}e': first[1]})
+        tail = Q(**{f'{first[0]}__{lookup}': first[1]})
+        equal = Q(**{first[0]: first[1]})
+        for name, value in rest:
+            tail |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return condition & tail
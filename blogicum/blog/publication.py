@@ -0,0 +1,74 @@
+from datetime import datetime
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Min
+from django.dispatch import Signal
+from django.utils import timezone
+
+from .models import Post
+
+NEXT_DUE_CACHE_KEY = 'blog:publication:next_due'
+NEVER = datetime.max.replace(tzinfo=timezone.utc)
+
+# Отправляется, когда отложенные публикации попадают в ленту.
+posts_published = Signal()
+
+
+def publish_due_posts(now=None):
+    """Включает в ленту отложенные публикации, время которых наступило."""
+    return Post.objects.filter(
+        is_visible=False,
+        is_published=True,
+        category__is_published=True,
+        pub_date__lt=now or timezone.now()
+    ).update(is_visible=True)
+
+
+def update_category_visibility(category, now=None):
+    posts = Post.objects.filter(category=category)
+    if not category.is_published:
+        return posts.filter(is_visible=True).update(is_visible=False)
+    return posts.filter(
+        is_visible=False,
+        is_published=True,
+        pub_date__lt=now or timezone.now()
+    ).update(is_visible=True)
+
+
+def get_next_due():
+    """Время ближайшей отложенной публикации."""
+    next_due = cache.get(NEXT_DUE_CACHE_KEY)
+    if next_due is None:
+        next_due = Post.objects.filter(
+            is_visible=False,
+            is_published=True,
+            category__is_published=True
+        ).aggregate(next_due=Min('pub_date'))['next_due'] or NEVER
+        cache.set(NEXT_DUE_CACHE_KEY, next_due, None)
+    return next_due
+
+
+def reset_next_due():
+    # После фиксации: иначе время пересчитали бы по старым строкам.
+    transaction.on_commit(lambda: cache.delete(NEXT_DUE_CACHE_KEY))
+
+
+def advance_publication(now=None):
+    now = now or timezone.now()
+    published = publish_due_posts(now)
+    reset_next_due()
+    if published:
+        posts_published.send(sender=Post, count=published)
+    return published
+
+
+def publish_if_due(now=None):
+    """Публикует отложенные посты, если время ближайшего из них наступило.
+
+    Время ближайшей публикации хранится в кеше, поэтому до его наступления
+    проверка не обращается к базе.
+    """
+    now = now or timezone.now()
+    if get_next_due() < now:
+        advance_publication(now)
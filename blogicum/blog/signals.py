@@ -0,0 +1,154 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import DEFERRED, F, Q
+from django.db.models.signals import (post_delete, post_init, post_save,
+                                      pre_delete)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .caching import (FEED_SCOPE, author_scope, bump_post_versions,
+                      bump_versions, count_scope, post_scopes)
+from .images import acquire_image, release_image, schedule_variants
+from .models import Category, Comment, Location, Post
+from .publication import (posts_published, reset_next_due,
+                          update_category_visibility)
+
+
+def change_comment_count(post_id, delta):
+    if post_id is None:
+        return
+    posts = Post.objects.filter(pk=post_id)
+    if delta < 0:
+        posts = posts.filter(comment_count__gte=-delta)
+    posts.update(
+        comment_count=F('comment_count') + delta,
+        updated_at=timezone.now()
+    )
+
+
+@receiver(post_save, sender=Comment)
+def count_saved_comment(sender, instance, created, **kwargs):
+    bump_post_versions(
+        {instance.post_id, getattr(instance, '_loaded_post_id', None)})
+    if created:
+        change_comment_count(instance.post_id, 1)
+    else:
+        loaded_post_id = getattr(instance, '_loaded_post_id', None)
+        if loaded_post_id is not None and loaded_post_id != instance.post_id:
+            change_comment_count(loaded_post_id, -1)
+            change_comment_count(instance.post_id, 1)
+        else:
+            Post.objects.filter(pk=instance.post_id).update(
+                updated_at=timezone.now())
+    instance._loaded_post_id = instance.post_id
+
+
+# Публикации, которые удаляются вместе с комментариями: счётчик
+# и версии кеша для каждого комментария им не нужны.
+deleting_post_ids = set()
+
+
+@receiver(pre_delete, sender=Post)
+def mark_deleting_post(sender, instance, **kwargs):
+    deleting_post_ids.add(instance.pk)
+
+
+@receiver(post_delete, sender=Post)
+def unmark_deleting_post(sender, instance, **kwargs):
+    deleting_post_ids.discard(instance.pk)
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(sender, instance, **kwargs):
+    if instance.post_id in deleting_post_ids:
+        return
+    bump_post_versions({instance.post_id})
+    change_comment_count(instance.post_id, -1)
+
+
+@receiver(post_save, sender=Post)
+def reschedule_publication(sender, instance, **kwargs):
+    if not instance.is_visible and instance.is_published:
+        reset_next_due()
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_scopes(sender, instance, **kwargs):
+    scopes = post_scopes(instance)
+    bump_versions(*scopes, *map(count_scope, scopes))
+    instance._loaded_category_id = instance.category_id
+    instance._loaded_author_id = instance.author_id
+
+
+@receiver(post_save, sender=Post)
+def track_post_image(sender, instance, raw=False, **kwargs):
+    loaded = getattr(instance, '_loaded_image', None)
+    if raw or loaded is DEFERRED:
+        return
+    source = instance.image.name
+    if source == loaded:
+        return
+    if source:
+        acquire_image(source)
+        transaction.on_commit(lambda: schedule_variants(source))
+    if loaded:
+        release_image(loaded)
+    instance._loaded_image = source
+
+
+@receiver(post_delete, sender=Post)
+def release_post_image(sender, instance, **kwargs):
+    if instance.image.name:
+        release_image(instance.image.name)
+
+
+@receiver(post_save, sender=Category)
+def update_posts_visibility(sender, instance, created, **kwargs):
+    loaded_is_published = getattr(instance, '_loaded_is_published', None)
+    if not created and loaded_is_published != instance.is_published:
+        update_category_visibility(instance)
+        reset_next_due()
+    instance._loaded_is_published = instance.is_published
+
+
+@receiver(pre_delete, sender=Category)
+def hide_category_posts(sender, instance, **kwargs):
+    Post.objects.filter(category=instance, is_visible=True).update(
+        is_visible=False)
+
+
+@receiver(posts_published)
+def invalidate_published(sender, **kwargs):
+    bump_versions()
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_all_scopes(sender, **kwargs):
+    bump_versions()
+
+
+@receiver(post_init, sender=get_user_model())
+def remember_username(sender, instance, **kwargs):
+    instance._loaded_username = instance.__dict__.get('username')
+
+
+@receiver(post_save, sender=get_user_model())
+def invalidate_author_scopes(sender, instance, created, update_fields=None,
+                             **kwargs):
+    loaded_username = getattr(instance, '_loaded_username', None)
+    instance._loaded_username = instance.username
+    if created or (update_fields is not None
+                   and set(update_fields) <= {'last_login'}):
+        return
+    # Имя пользователя выводится в его публикациях и комментариях.
+    bump_post_versions(set(Post.objects.filter(
+        Q(author=instance) | Q(comments__author=instance)
+    ).values_list('pk', flat=True)))
+    scopes = {FEED_SCOPE, author_scope(instance.username)}
+    if loaded_username:
+        scopes.add(author_scope(loaded_username))
+    bump_versions(*scopes)
@@ -0,0 +1,79 @@
+import hashlib
+import os
+import posixpath
+import re
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+HASH_CHUNK_SIZE = 1024 * 1024
+HASH_NAME_RE = re.compile(r'[0-9a-f]{64}(\.\w+)?')
+# Два уровня каталогов по два шестнадцатеричных символа: не больше
+# 256 элементов в каждом каталоге над файлами.
+SHARD_DEPTH = 2
+SHARD_WIDTH = 2
+
+
+def content_hash(file):
+    """SHA-256 содержимого файла, читаемого по частям."""
+    digest = hashlib.sha256()
+    if hasattr(file, 'chunks'):
+        for chunk in file.chunks(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+        file.seek(0)
+    else:
+        for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def shards(filename):
+    """Каталоги файла: префиксы хеша из имени или хеша самого имени."""
+    if HASH_NAME_RE.fullmatch(filename):
+        key = filename
+    else:
+        key = hashlib.sha256(filename.encode()).hexdigest()
+    return [
+        key[level * SHARD_WIDTH:(level + 1) * SHARD_WIDTH]
+        for level in range(SHARD_DEPTH)
+    ]
+
+
+def is_sharded(name):
+    *directory, filename = name.split('/')
+    return directory[-SHARD_DEPTH:] == shards(filename)
+
+
+def sharded_name(name):
+    """Имя файла в каталогах по префиксам хеша, например ab/cd/abcd….jpg."""
+    if is_sharded(name):
+        return name
+    directory, filename = posixpath.split(name)
+    return posixpath.join(directory, *shards(filename), filename)
+
+
+def content_name(name, digest):
+    _, ext = os.path.splitext(name)
+    return sharded_name(
+        posixpath.join(posixpath.dirname(name), f'{digest}{ext.lower()}'))
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """Хранит файлы под хешем их содержимого.
+
+    Одинаковые файлы сохраняются один раз: если файл с таким хешем уже
+    есть, возвращается его имя. Файлы раскладываются по каталогам
+    префиксов хеша (sharded_name), чтобы ни один каталог не разрастался.
+    """
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        name = content_name(name, content_hash(content))
+        if self.exists(name):
+            # Свежее время изменения защищает файл от сборщика мусора,
+            # пока новая ссылка на него ещё не записана в базу.
+            os.utime(self.path(name))
+            return name
+        return super().save(name, content, max_length)
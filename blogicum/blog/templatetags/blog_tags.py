@@ -0,0 +1,77 @@
+from django import template
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from blog.caching import card_cache_key
+from blog.consts import (CARD_CACHE_TIMEOUT, IMAGE_FALLBACK_FORMAT,
+                         IMAGE_SIZES_ATTR)
+from blog.holes import make_hole, render_hole
+from blog.images import get_formats, get_variants
+
+register = template.Library()
+
+# Копии, из которых браузер выбирает ширину по srcset.
+SRCSET_SIZES = ('card', 'detail')
+
+
+@register.simple_tag
+def post_card(post):
+    card = getattr(post, 'cached_card', None)
+    if card is None:
+        card = render_to_string('includes/post_card.html', {'post': post})
+        key = getattr(post, 'card_cache_key', None) or card_cache_key(post)
+        cache.set(key, card, CARD_CACHE_TIMEOUT)
+    return mark_safe(card)
+
+
+def srcset(variants, image_format):
+    """Копии одного формата для srcset, без повторов ширины."""
+    candidates = {}
+    for size in SRCSET_SIZES:
+        variant = variants.get((size, image_format))
+        if variant is not None:
+            candidates.setdefault(variant.width, variant.file.url)
+    return ', '.join(
+        f'{url} {width}w' for width, url in sorted(candidates.items()))
+
+
+@register.inclusion_tag('includes/post_image.html')
+def post_image(post, size, css_class='', loading='lazy'):
+    """Изображение публикации в копии размера size, если она готова.
+
+    Браузер выбирает формат из <source>, а ширину — по srcset и sizes;
+    JPEG в <img> остаётся для браузеров без WebP и AVIF.
+    """
+    context = {'css_class': css_class, 'loading': loading}
+    variants = get_variants(post)
+    variant = variants.get((size, IMAGE_FALLBACK_FORMAT))
+    if variant is None:
+        return {**context, 'src': post.image.url}
+    return {
+        **context,
+        'src': variant.file.url,
+        'srcset': srcset(variants, IMAGE_FALLBACK_FORMAT),
+        'sources': [
+            {'type': f'image/{image_format}',
+             'srcset': srcset(variants, image_format)}
+            for image_format in get_formats()
+            if image_format != IMAGE_FALLBACK_FORMAT
+            and (size, image_format) in variants
+        ],
+        'sizes': IMAGE_SIZES_ATTR,
+        'width': variant.width,
+        'height': variant.height,
+    }
+
+
+@register.simple_tag(takes_context=True)
+def hole(context, name, **kwargs):
+    """Персональный фрагмент страницы из includes/holes/.
+
+    В закешированных страницах выводится меткой, которая заполняется
+    для каждого читателя при ответе.
+    """
+    if context.get('punch_holes'):
+        return make_hole(name, **kwargs)
+    return render_hole(context, name, **kwargs)
@@ -0,0 +1,90 @@
+"""Загрузка фотографий с ограниченным расходом памяти.
+
+Файлы из форм пишутся на диск по частям и не держатся в памяти целиком;
+сверх IMAGE_MAX_UPLOAD_SIZE байт не принимается. Большие фотографии
+можно загрузить заранее по частям (ChunkedUpload) и продолжить
+загрузку после обрыва соединения.
+"""
+import os
+
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+
+from .consts import IMAGE_MAX_UPLOAD_SIZE
+
+COPY_BUFFER_SIZE = 64 * 1024
+
+
+class LimitedTemporaryFileUploadHandler(TemporaryFileUploadHandler):
+    """Пишет файл во временный файл и перестаёт писать сверх лимита.
+
+    Превышение не прерывает разбор запроса: файл помечается too_large,
+    и форма сообщает об ошибке в поле.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > IMAGE_MAX_UPLOAD_SIZE:
+            return None
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        file = super().file_complete(file_size)
+        file.too_large = self.received > IMAGE_MAX_UPLOAD_SIZE
+        return file
+
+
+class ChunkedUploadedFile(UploadedFile):
+    """Собранная по частям загрузка в виде файла формы.
+
+    Хранилище перемещает такой файл на место, а не копирует его.
+    """
+
+    def __init__(self, upload):
+        super().__init__(
+            file=open(upload.path, 'rb'),
+            name=upload.filename,
+            size=upload.size
+        )
+        self.upload = upload
+
+    def temporary_file_path(self):
+        return str(self.upload.path)
+
+    def close(self):
+        try:
+            return self.file.close()
+        except FileNotFoundError:
+            pass
+
+
+def write_chunk(upload, stream, start, length):
+    """Записывает часть с позиции start, возвращает новую позицию.
+
+    Повторная отправка уже принятой части просто перезаписывает
+    те же байты.
+    """
+    upload.path.parent.mkdir(parents=True, exist_ok=True)
+    mode = 'r+b' if upload.path.exists() else 'wb'
+    with open(upload.path, mode) as file:
+        file.seek(start)
+        remaining = length
+        while remaining:
+            data = stream.read(min(COPY_BUFFER_SIZE, remaining))
+            if not data:
+                break
+            file.write(data)
+            remaining -= len(data)
+    return start + length - remaining
+
+
+def discard_upload(upload):
+    try:
+        os.remove(upload.path)
+    except FileNotFoundError:
+        pass
+    upload.delete()
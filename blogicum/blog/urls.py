@@ -20,12 +20,18 @@ urlpatterns = [
 
     path('posts/<int:post_id>/comments/',
          views.add_comment, name='add_comment'),
+    path('posts/<int:post_id>/comments/more/',
+         views.CommentListView.as_view(), name='comments'),
     path('posts/<int:post_id>/edit_comment/<int:comment_id>/',
          login_required(views.CommentUpdateView.as_view()),
          name='edit_comment'),
     path('posts/<int:post_id>/delete_comment/<int:comment_id>/',
          views.delete_comment, name='delete_comment'),
 
+    path('uploads/', views.start_upload, name='start_upload'),
+    path('uploads/<uuid:upload_id>/',
+         views.upload_chunk, name='upload_chunk'),
+
     path('category/<slug:category_slug>/',
          views.CategoryListView.as_view(), name='category_posts'),
 
@@ -1,42 +1,70 @@
+import os
+import re
+
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Count
-from django.http import Http404
+from django.db import transaction
+from django.db.models import Q
+from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
+from django.template.defaultfilters import filesizeformat
 from django.urls import reverse, reverse_lazy
-from django.utils import timezone
+from django.views.decorators.http import require_http_methods, require_POST
 from django.views.generic import (CreateView, DeleteView, DetailView, ListView,
                                   UpdateView)
 
-from .consts import POSTS_ON_PAGE
+from .caching import (FEED_SCOPE, author_scope, category_scope, get_versions,
+                      make_validators, post_scope)
+from .consts import (COMMENTS_ON_PAGE, IMAGE_MAX_UPLOAD_SIZE, POSTS_ON_PAGE,
+                     UPLOAD_CHUNK_SIZE)
 from .forms import CommentForm
-from .mixins import PostMixin, PostUpdateMixin
-from .models import Category, Comment, Post
+from .mixins import (FeedCacheMixin, KeysetPaginationMixin, PageCacheMixin,
+                     PostMixin, PostUpdateMixin, PublishDuePostsMixin)
+from .models import Category, ChunkedUpload, Comment, Post
+from .paginators import KeysetPaginator
+from .uploads import write_chunk
 from users.forms import CustomUserChangeForm
 
 
-def post_published_filter():
-    return Post.objects.all().filter(
-        is_published=True,
-        category__is_published=True,
-        pub_date__lt=timezone.now()
-    ).select_related('author', 'location', 'category')
+def post_visible_to(user):
+    """Условие видимости публикации: автор видит и скрытые публикации."""
+    visible = Q(is_visible=True)
+    if user.is_authenticated:
+        visible |= Q(author_id=user.pk)
+    return visible
+
+
+CONTENT_RANGE_RE = re.compile(r'bytes (\d+)-(\d+)/(\d+)')
+
+# Колонки, которые нужны карточке публикации, её ключу кеша и валидаторам.
+POST_CARD_FIELDS = (
+    'title', 'excerpt', 'image', 'pub_date', 'is_published', 'updated_at',
+    'comment_count', 'author__username', 'category__slug',
+    'category__title', 'category__is_published', 'location__name',
+    'location__is_published',
+)
 
 
-def add_comment_count(queryset):
-    return queryset.annotate(comment_count=Count('comments'))
+def post_cards():
+    return Post.objects.select_related(
+        'author', 'location', 'category'
+    ).only(*POST_CARD_FIELDS)
 
 
-class PostListView(PostMixin, ListView):
+def post_published_filter():
+    return post_cards().filter(is_visible=True)
+
+
+class PostListView(PublishDuePostsMixin, FeedCacheMixin,
+                   KeysetPaginationMixin, PostMixin, ListView):
     template_name = 'blog/index.html'
-    ordering = ('-pub_date',)
+    ordering = ('-pub_date', '-id')
     paginate_by = POSTS_ON_PAGE
+    cache_scopes = (FEED_SCOPE,)
 
     def get_queryset(self):
-        return add_comment_count(
-            post_published_filter()
-        ).order_by(*self.ordering)
+        return post_published_filter().order_by(*self.ordering)
 
 
 class PostCreateView(LoginRequiredMixin, PostMixin, CreateView):
@@ -50,33 +78,47 @@ class PostCreateView(LoginRequiredMixin, PostMixin, CreateView):
         return super().form_valid(form)
 
 
-class PostDetailView(PostMixin, DetailView):
+class PostDetailView(PublishDuePostsMixin, PageCacheMixin, PostMixin,
+                     DetailView):
     template_name = 'blog/detail.html'
     pk_url_kwarg = 'post_id'
 
     def get_object(self, queryset=None):
-        self.queryset = self.get_queryset().filter(
-            pk=self.kwargs[self.pk_url_kwarg])
-        try:
-            post = self.queryset.get()
-            if post.author == self.request.user:
-                return post
-            return self.queryset.filter(
-                is_published=True,
-                category__is_published=True,
-                pub_date__lt=timezone.now()
-            ).get()
-        except self.queryset.model.DoesNotExist:
-            raise Http404
+        return get_object_or_404(
+            Post.objects.select_related('author', 'location', 'category'),
+            post_visible_to(self.request.user),
+            pk=self.kwargs[self.pk_url_kwarg]
+        )
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['form'] = CommentForm()
-        context['comments'] = (
-            self.object.comments.select_related('author')
-        )
+        context['comments_page'] = KeysetPaginator(
+            self.object.comments.select_related('author'),
+            COMMENTS_ON_PAGE,
+            CommentListView.ordering
+        ).page()
         return context
 
+    def get_cache_scopes(self):
+        return (post_scope(self.kwargs[self.pk_url_kwarg]),)
+
+    def is_response_cacheable(self):
+        # Скрытую публикацию видит только автор, такую страницу не делим.
+        return self.object.is_visible
+
+    def get_validators(self, context):
+        # updated_at публикации сдвигается и при изменении её комментариев.
+        post = self.object
+        versions = get_versions(*self.get_cache_scopes())
+        return make_validators(
+            [self.get_cache_variant(), versions, post.pk, post.updated_at,
+             post.comment_count,
+             [comment.pk for comment in context['comments_page']]],
+            [version / 10 ** 9 for version in versions]
+            + [post.updated_at.timestamp()]
+        )
+
 
 class PostUpdateView(LoginRequiredMixin, PostMixin, PostUpdateMixin,
                      UpdateView):
@@ -92,38 +134,33 @@ class PostDeleteView(LoginRequiredMixin, PostMixin, PostUpdateMixin,
     pk_url_kwarg = 'post_id'
 
 
-class CategoryListView(ListView):
+class CategoryListView(PublishDuePostsMixin, FeedCacheMixin,
+                       KeysetPaginationMixin, ListView):
     template_name = 'blog/category.html'
-    ordering = ('-pub_date',)
+    ordering = ('-pub_date', '-id')
     paginate_by = POSTS_ON_PAGE
 
+    def get_cache_scopes(self):
+        return (category_scope(self.kwargs['category_slug']),)
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['category'] = get_object_or_404(
-            Category, slug=self.kwargs['category_slug']
-        )
+        context['category'] = self.category
         return context
 
     def get_queryset(self):
-        category = get_object_or_404(
+        self.category = get_object_or_404(
             Category,
             slug=self.kwargs['category_slug'],
             is_published=True
         )
-        return add_comment_count(
-            Post.objects.all().filter(
-                category=category,
-            ).filter(
-                is_published=True,
-                category__is_published=True,
-                pub_date__lt=timezone.now()
-            ).select_related(
-                'author', 'location', 'category'
-            )
+        return post_published_filter().filter(
+            category=self.category,
         ).order_by(*self.ordering)
 
 
 @login_required
+@transaction.atomic
 def add_comment(request, post_id):
     post = get_object_or_404(Post, pk=post_id)
     form = CommentForm(request.POST)
@@ -136,6 +173,46 @@ def add_comment(request, post_id):
     return redirect('blog:post_detail', post_id=post_id)
 
 
+class CommentListView(PublishDuePostsMixin, PageCacheMixin,
+                      KeysetPaginationMixin, ListView):
+    """Фрагмент со следующей страницей комментариев к публикации."""
+
+    template_name = 'includes/comment_list.html'
+    ordering = ('created_at', 'id')
+    paginate_by = COMMENTS_ON_PAGE
+    allow_page_numbers = False
+
+    def get_cache_scopes(self):
+        return (post_scope(self.kwargs['post_id']),)
+
+    def get_queryset(self):
+        self.post = get_object_or_404(
+            Post.objects.only('id', 'author_id', 'is_visible'),
+            post_visible_to(self.request.user),
+            pk=self.kwargs['post_id']
+        )
+        return self.post.comments.select_related('author').order_by(
+            *self.ordering)
+
+    def is_response_cacheable(self):
+        return self.post.is_visible
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['post'] = self.post
+        context['comments_page'] = context['page_obj']
+        return context
+
+    def get_validators(self, context):
+        page = context['page_obj']
+        versions = get_versions(*self.get_cache_scopes())
+        return make_validators(
+            [self.get_cache_variant(), versions,
+             [comment.pk for comment in page], page.has_next()],
+            [version / 10 ** 9 for version in versions]
+        )
+
+
 class CommentUpdateView(LoginRequiredMixin, UpdateView):
     model = Comment
     form_class = CommentForm
@@ -153,6 +230,7 @@ class CommentUpdateView(LoginRequiredMixin, UpdateView):
 
 
 @login_required
+@transaction.atomic
 def delete_comment(request, post_id, comment_id):
     instance = get_object_or_404(Comment, pk=comment_id, author=request.user)
     if request.method == 'POST':
@@ -161,41 +239,100 @@ def delete_comment(request, post_id, comment_id):
     return render(request, 'blog/comment.html')
 
 
-class ProfileListView(ListView):
+class ProfileListView(PublishDuePostsMixin, FeedCacheMixin,
+                      KeysetPaginationMixin, ListView):
     model = Post
     template_name = 'blog/profile.html'
     paginate_by = POSTS_ON_PAGE
-    ordering = ('-pub_date',)
+    ordering = ('-pub_date', '-id')
+
+    def is_owner(self):
+        return self.author.pk == self.request.user.pk
+
+    def get_cache_scopes(self):
+        return (author_scope(self.kwargs['username']),)
+
+    def get_cache_variant(self):
+        user = self.request.user
+        if user.is_authenticated and user.username == self.kwargs['username']:
+            return 'owner'
+        return super().get_cache_variant()
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['profile'] = get_object_or_404(
-            get_user_model().objects.all().filter(
-                username=self.kwargs['username'])
-        )
+        context['profile'] = self.author
         return context
 
     def get_queryset(self):
-        author = get_object_or_404(
+        self.author = get_object_or_404(
             get_user_model(),
             username=self.kwargs['username']
         )
 
-        authors_posts = add_comment_count(
-            Post.objects.all().filter(
-                author_id=author.id
-            ).select_related(
-                'author', 'location', 'category'
-            )
+        authors_posts = post_cards().filter(
+            author_id=self.author.id
         ).order_by(*self.ordering)
 
-        if str(author.username) == str(self.request.user):
+        if self.is_owner():
             return authors_posts
-        return authors_posts.filter(
-            is_published=True,
-            category__is_published=True,
-            pub_date__lt=timezone.now()
+        return authors_posts.filter(is_visible=True)
+
+
+@login_required
+@require_POST
+def start_upload(request):
+    """Начинает загрузку фотографии по частям."""
+    try:
+        size = int(request.POST['size'])
+        filename = os.path.basename(request.POST['filename'])
+    except (KeyError, ValueError):
+        return JsonResponse({'error': 'Укажите имя и размер файла.'},
+                            status=400)
+    if not filename or not 0 < size <= IMAGE_MAX_UPLOAD_SIZE:
+        return JsonResponse(
+            {'error': 'Файл пуст или больше '
+                      f'{filesizeformat(IMAGE_MAX_UPLOAD_SIZE)}.'},
+            status=400
         )
+    upload = ChunkedUpload.objects.create(
+        user=request.user, filename=filename, size=size)
+    return JsonResponse(
+        {'id': upload.pk, 'offset': 0, 'chunk_size': UPLOAD_CHUNK_SIZE},
+        status=201
+    )
+
+
+@login_required
+@require_http_methods(['GET', 'PUT'])
+def upload_chunk(request, upload_id):
+    """Состояние загрузки (GET) или приём очередной части (PUT).
+
+    Часть передаётся телом запроса, её место — заголовком
+    Content-Range: bytes начало-конец/размер.
+    """
+    upload = get_object_or_404(ChunkedUpload, pk=upload_id,
+                               user=request.user)
+    if request.method == 'GET':
+        return JsonResponse({'offset': upload.offset, 'size': upload.size})
+    match = CONTENT_RANGE_RE.fullmatch(
+        request.headers.get('Content-Range', ''))
+    if match is None:
+        return JsonResponse({'error': 'Нужен заголовок Content-Range.'},
+                            status=400)
+    start, end, total = map(int, match.groups())
+    length = end - start + 1
+    if (total != upload.size or end >= total or length <= 0
+            or length > 2 * UPLOAD_CHUNK_SIZE):
+        return JsonResponse({'error': 'Некорректный диапазон части.'},
+                            status=400)
+    if start > upload.offset:
+        # Пропущена часть: клиент продолжит с принятой позиции.
+        return JsonResponse({'offset': upload.offset}, status=409)
+    written = write_chunk(upload, request, start, length)
+    if written > upload.offset:
+        upload.offset = written
+        upload.save(update_fields=['offset'])
+    return JsonResponse({'offset': upload.offset, 'size': upload.size})
 
 
 @login_required
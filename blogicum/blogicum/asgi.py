@@ -9,8 +9,16 @@ https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
+from core.precompile import precompile
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
 
 application = get_asgi_application()
+
+# Шаблоны компилируются до первого запроса, ошибка в шаблоне прерывает
+# запуск процесса.
+if not settings.DEBUG:
+    precompile()
@@ -1,11 +1,13 @@
 from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
 from django.contrib.auth.forms import AuthenticationForm, UserCreationForm
 from django.contrib.auth.views import LoginView
-from django.urls import include, path, reverse_lazy
+from django.urls import include, path, re_path, reverse_lazy
 from django.views.generic.edit import CreateView
 
+from blog.media import serve as serve_media
+from core.staticfiles import serve as serve_static
+
 handler404 = 'pages.views.handler_404'
 handler403 = 'pages.views.handler_403'
 handler500 = 'pages.views.handler_500'
@@ -31,12 +33,19 @@ urlpatterns = [
         ),
         name='login',
     ),
+    re_path(
+        rf'^{settings.MEDIA_URL.lstrip("/")}(?P<path>.+)$',
+        serve_media,
+        name='media',
+    ),
+    re_path(
+        rf'^{settings.STATIC_URL.lstrip("/")}(?P<path>.+)$',
+        serve_static,
+        name='static',
+    ),
     path('', include('blog.urls', namespace='blog')),
 ]
 
 if settings.DEBUG:
     import debug_toolbar
     urlpatterns += (path('__debug__/', include(debug_toolbar.urls)),)
-    urlpatterns += (
-        static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
-    )
@@ -9,8 +9,16 @@ https://docs.djangoproject.com/en/3.2/howto/deployment/wsgi/
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
+from core.precompile import precompile
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
 
 application = get_wsgi_application()
+
+# Шаблоны компилируются до первого запроса, ошибка в шаблоне прерывает
+# запуск процесса.
+if not settings.DEBUG:
+    precompile()
@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """Кеш страниц и версий должен быть общим для всех процессов."""
+    backend = settings.CACHES['default']['BACKEND']
+    if settings.DEBUG or backend not in LOCAL_CACHE_BACKENDS:
+        return []
+    return [Error(
+        f'Кеш {backend} виден только своему процессу.',
+        hint=('Сброс версий кеша в одном процессе не дойдёт до остальных, '
+              'и они будут отдавать устаревшие страницы. Укажите в CACHES '
+              'общий кеш: Redis, Memcached, файловый или в базе данных.'),
+        id='core.E001',
+    )]
@@ -0,0 +1,103 @@
+"""Сжатие ответов: выбор кодировки по Accept-Encoding и потоковые кодеры.
+
+brotli используется, если установлен одноимённый пакет; иначе остаётся
+gzip. Кодер сжимает ответ по частям и сбрасывает каждую часть клиенту,
+не дожидаясь конца ответа.
+"""
+import zlib
+
+from django.conf import settings
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class GzipEncoder:
+    def __init__(self, level):
+        self.compressor = zlib.compressobj(
+            level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data, flush=True):
+        compressed = self.compressor.compress(data)
+        if flush:
+            compressed += self.compressor.flush(zlib.Z_SYNC_FLUSH)
+        return compressed
+
+    def finish(self):
+        return self.compressor.flush()
+
+
+class BrotliEncoder:
+    def __init__(self, quality):
+        self.compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data, flush=True):
+        compressed = self.compressor.process(data)
+        if flush:
+            compressed += self.compressor.flush()
+        return compressed
+
+    def finish(self):
+        return self.compressor.finish()
+
+
+# Кодировки в порядке предпочтения при равном весе в Accept-Encoding.
+ENCODERS = {'gzip': GzipEncoder}
+if brotli is not None:
+    ENCODERS = {'br': BrotliEncoder, **ENCODERS}
+
+
+def get_level(encoding):
+    if encoding == 'br':
+        return settings.COMPRESSION_BROTLI_QUALITY
+    return settings.COMPRESSION_GZIP_LEVEL
+
+
+def parse_accept_encoding(header):
+    """Веса кодировок из заголовка Accept-Encoding."""
+    weights = {}
+    for item in header.split(','):
+        coding, *params = item.split(';')
+        weight = 1.0
+        for param in params:
+            name, _, value = param.strip().partition('=')
+            if name == 'q':
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        if coding.strip():
+            weights[coding.strip().lower()] = weight
+    return weights
+
+
+def negotiate(header, encodings=None):
+    """Лучшая из доступных кодировок, которую принимает клиент, или None.
+
+    Доступные кодировки перечисляются в порядке предпочтения; по
+    умолчанию это кодеры ENCODERS.
+    """
+    weights = parse_accept_encoding(header)
+    best, best_weight = None, 0.0
+    for encoding in ENCODERS if encodings is None else encodings:
+        weight = weights.get(encoding, weights.get('*', 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def compress(data, encoding, level):
+    encoder = ENCODERS[encoding](level)
+    return encoder.compress(data, flush=False) + encoder.finish()
+
+
+def compress_stream(chunks, encoding, level):
+    """Сжимает последовательность частей, отдавая каждую сразу."""
+    encoder = ENCODERS[encoding](level)
+    for chunk in chunks:
+        compressed = encoder.compress(chunk)
+        if compressed:
+            yield compressed
+    yield encoder.finish()
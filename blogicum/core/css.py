@@ -0,0 +1,153 @@
+"""Сокращение таблицы стилей до классов, которые встречаются в разметке.
+
+Из шаблонов, скриптов и модулей, которые выводят разметку, берутся все
+слова, похожие на имена классов: лишнее слово лишь сохраняет правило,
+а пропущенный класс потерял бы оформление. В таблице стилей остаются
+селекторы, все классы которых есть среди этих слов.
+"""
+import re
+from importlib import import_module
+from pathlib import Path
+
+from django.conf import settings
+from django.template.utils import get_app_template_dirs
+
+TOKEN_RE = re.compile(r'-?[A-Za-z_][\w-]*')
+CLASS_RE = re.compile(r'\.(-?[A-Za-z_](?:[\w-]|\\.)*)')
+COMMENT_RE = re.compile(r'/\*.*?\*/', re.S)
+LICENSE_RE = re.compile(r'/\*!.*?\*/', re.S)
+SOURCE_STYLESHEET = 'css/bootstrap.min.css'
+PURGED_STYLESHEET = 'css/bootstrap.purged.min.css'
+# Правила первого экрана встраиваются в страницу этим шаблоном; сам он
+# собирается из таблицы стилей и потому не сканируется.
+CRITICAL_TEMPLATE = 'includes/critical_css.html'
+CRITICAL_TEMPLATES = (
+    'base.html',
+    'includes/header.html',
+    'includes/holes/user_menu.html',
+)
+# Пакеты, которые сами выводят разметку с классами Bootstrap.
+MARKUP_PACKAGES = ('django_bootstrap5',)
+# Правила внутри этих блоков отбираются так же, как правила верхнего уровня.
+NESTED_AT_RULES = ('@media', '@supports')
+
+
+def tokens(text):
+    return set(TOKEN_RE.findall(text))
+
+
+def markup_files():
+    """Шаблоны проекта и приложений и скрипты из STATICFILES_DIRS."""
+    template_dirs = [
+        Path(directory)
+        for engine in settings.TEMPLATES for directory in engine['DIRS']
+    ] + [Path(directory) for directory in get_app_template_dirs('templates')]
+    for directory in template_dirs:
+        yield from sorted(
+            path for path in directory.rglob('*.html')
+            if path != directory / CRITICAL_TEMPLATE
+        )
+    for directory in settings.STATICFILES_DIRS:
+        yield from sorted(Path(directory).rglob('*.js'))
+    # Формы выводит django_bootstrap5, и классы полей заданы в его коде.
+    for name in MARKUP_PACKAGES:
+        package = Path(import_module(name).__file__).parent
+        yield from sorted(package.rglob('*.py'))
+        yield from sorted(package.rglob('*.html'))
+
+
+def used_tokens(paths=None):
+    used = set()
+    for path in markup_files() if paths is None else paths:
+        used |= tokens(Path(path).read_text(encoding='utf-8'))
+    return used
+
+
+def class_names(selector):
+    return {name.replace('\\', '') for name in CLASS_RE.findall(selector)}
+
+
+def split_selectors(prelude):
+    """Селекторы через запятую без разбиения :not(a, b)."""
+    selectors, depth, start = [], 0, 0
+    for position, char in enumerate(prelude):
+        if char in '([':
+            depth += 1
+        elif char in ')]':
+            depth -= 1
+        elif char == ',' and not depth:
+            selectors.append(prelude[start:position])
+            start = position + 1
+    selectors.append(prelude[start:])
+    return [selector.strip() for selector in selectors]
+
+
+def find_block_end(css, start):
+    """Позиция закрывающей скобки блока, открытого в css[start]."""
+    depth = 0
+    for position in range(start, len(css)):
+        if css[position] == '{':
+            depth += 1
+        elif css[position] == '}':
+            depth -= 1
+            if not depth:
+                return position
+    raise ValueError('Незакрытый блок в таблице стилей.')
+
+
+def parse(css):
+    """Пары (заголовок, тело) правил верхнего уровня.
+
+    Для @charset, @import и других правил без блока тело равно None.
+    """
+    css = COMMENT_RE.sub('', css)
+    position = 0
+    while position < len(css):
+        brace = css.find('{', position)
+        semicolon = css.find(';', position)
+        if brace == -1 and semicolon == -1:
+            return
+        if css.startswith('@', position) and -1 < semicolon < (
+                brace if brace != -1 else len(css)):
+            yield css[position:semicolon + 1].strip(), None
+            position = semicolon + 1
+            continue
+        end = find_block_end(css, brace)
+        yield css[position:brace].strip(), css[brace + 1:end]
+        position = end + 1
+
+
+def select(css, keep):
+    """Правила css, селекторы которых используют только классы из keep."""
+    rules = []
+    for prelude, body in parse(css):
+        if body is None:
+            rules.append(prelude)
+        elif prelude.startswith(NESTED_AT_RULES):
+            nested = select(body, keep)
+            if nested:
+                rules.append(f'{prelude}{{{nested}}}')
+        elif prelude.startswith('@'):
+            # @font-face, @keyframes и подобные сохраняются целиком.
+            rules.append(f'{prelude}{{{body}}}')
+        else:
+            selectors = [
+                selector for selector in split_selectors(prelude)
+                if class_names(selector) <= keep
+            ]
+            if selectors:
+                rules.append(f'{",".join(selectors)}{{{body}}}')
+    return ''.join(rules)
+
+
+def purge(css, keep):
+    """Сокращённая таблица стилей с сохранёнными лицензионными комментариями.
+
+    Комментарии идут после @charset, который должен стоять первым.
+    """
+    rules = select(css, keep)
+    charset = ''
+    if rules.startswith('@charset'):
+        charset, rules = rules.split(';', 1)
+        charset += ';'
+    return charset + ''.join(LICENSE_RE.findall(css)) + rules
@@ -0,0 +1,127 @@
+"""Отдача файлов с диска с диапазонами байт и условными запросами.
+
+Тело отдаётся FileResponse: WSGI-сервер с wsgi.file_wrapper копирует
+файл в сокет через os.sendfile, не читая его в память процесса.
+"""
+import mimetypes
+import os
+import posixpath
+import re
+
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.http import http_date, parse_http_date_safe
+
+RANGE_RE = re.compile(r'bytes=(\d*)-(\d*)')
+
+
+class FileRange:
+    """Часть открытого файла длиной length, начиная с позиции start.
+
+    fileno() оставлен, чтобы WSGI-сервер мог отдать часть через
+    os.sendfile: он начинает с текущей позиции файла и отдаёт столько
+    байт, сколько указано в Content-Length.
+    """
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def resolve(root, path):
+    """Нормализованный путь, полный путь и stat файла внутри root."""
+    path = posixpath.normpath(path).lstrip('/')
+    try:
+        full_path = safe_join(root, path)
+        stat = os.stat(full_path)
+    except (SuspiciousFileOperation, OSError):
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+    return path, full_path, stat
+
+
+def file_etag(stat):
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+def set_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+def parse_range(header, size):
+    """Границы (start, end) единственного диапазона из заголовка Range.
+
+    None — диапазона нет или он не поддерживается, и отдаётся весь файл;
+    ValueError — диапазон за пределами файла.
+    """
+    match = RANGE_RE.fullmatch(header.replace(' ', ''))
+    if match is None or match.group(1) == match.group(2) == '':
+        return None
+    start, end = match.groups()
+    if start == '':
+        start, end = max(size - int(end), 0), size - 1
+    else:
+        start = int(start)
+        end = min(int(end), size - 1) if end else size - 1
+    if start > end or start >= size:
+        raise ValueError(header)
+    return start, end
+
+
+def if_range_matches(request, etag, last_modified):
+    if_range = request.headers.get('If-Range')
+    if if_range is None:
+        return True
+    if if_range.startswith(('"', 'W/')):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == last_modified
+
+
+def file_response(request, full_path, stat, etag, last_modified,
+                  content_type=None, encoding=None):
+    """Весь файл или запрошенный диапазон байт."""
+    if content_type is None:
+        content_type, encoding = mimetypes.guess_type(full_path)
+    content_type = content_type or 'application/octet-stream'
+    headers = {'Content-Encoding': encoding} if encoding else {}
+    byte_range = None
+    if if_range_matches(request, etag, last_modified):
+        try:
+            byte_range = parse_range(
+                request.headers.get('Range', ''), stat.st_size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{stat.st_size}'
+            return response
+    file = open(full_path, 'rb')
+    if byte_range is None:
+        response = FileResponse(
+            file, content_type=content_type, headers=headers)
+        response['Content-Length'] = stat.st_size
+        return response
+    start, end = byte_range
+    length = end - start + 1
+    response = FileResponse(
+        FileRange(file, start, length), status=206,
+        content_type=content_type, headers=headers)
+    response['Content-Length'] = length
+    response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+    return response
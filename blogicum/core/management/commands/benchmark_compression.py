@@ -0,0 +1,56 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.compression import ENCODERS, compress
+from core.pages import get_client, page_mix
+
+LEVELS = {'gzip': range(1, 10), 'br': range(0, 12)}
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает уровни сжатия gzip и brotli на страницах блога: '
+            'размер ответа и скорость сжатия.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'urls', nargs='*',
+            help='Адреса страниц; по умолчанию лента, категория, '
+                 'публикация и профиль.'
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=20,
+            help='Сколько раз сжимать каждую страницу для замера времени.'
+        )
+
+    def handle(self, *args, **options):
+        client = get_client()
+        pages = []
+        for url in options['urls'] or page_mix():
+            response = client.get(url)
+            if response.status_code == 200:
+                pages.append(response.content)
+            else:
+                self.stderr.write(f'{url}: {response.status_code}')
+        total = sum(len(page) for page in pages)
+        if not total:
+            self.stderr.write('Нет страниц для замера.')
+            return
+        self.stdout.write(
+            f'Страниц: {len(pages)}, исходный размер: {total} байт')
+        self.stdout.write('кодировка уровень   размер  доля   МБ/с')
+        for encoding in ENCODERS:
+            for level in LEVELS[encoding]:
+                size, seconds = self.measure(
+                    pages, encoding, level, options['repeat'])
+                self.stdout.write(
+                    f'{encoding:>9} {level:>7} {size:>8} '
+                    f'{size / total:5.1%} '
+                    f'{total * options["repeat"] / seconds / 2 ** 20:6.1f}'
+                )
+
+    def measure(self, pages, encoding, level, repeat):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            size = sum(len(compress(page, encoding, level)) for page in pages)
+        return size, time.perf_counter() - started
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.precompile import compile_templates
+
+
+class Command(BaseCommand):
+    help = ('Компилирует все шаблоны проекта и показывает время компиляции '
+            'и число узлов каждого; завершается ошибкой, если какой-то '
+            'шаблон не компилируется.')
+
+    def handle(self, *args, **options):
+        results = sorted(
+            compile_templates(), key=lambda result: result[1], reverse=True)
+        self.stdout.write('    мс  узлов  шаблон')
+        for name, seconds, nodes, error in results:
+            if error is None:
+                self.stdout.write(f'{seconds * 1000:6.2f} {nodes:>6}  {name}')
+        errors = [
+            f'{name}: {error}'
+            for name, _, _, error in results if error is not None
+        ]
+        if errors:
+            raise CommandError(
+                'Не удалось скомпилировать шаблоны:\n' + '\n'.join(errors))
+        total = sum(result[1] for result in results)
+        self.stdout.write(self.style.SUCCESS(
+            f'Шаблонов: {len(results)}, всего {total * 1000:.1f} мс.'
+        ))
@@ -0,0 +1,52 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.css import (CRITICAL_TEMPLATE, CRITICAL_TEMPLATES,
+                      PURGED_STYLESHEET, SOURCE_STYLESHEET, purge, select,
+                      used_tokens)
+
+
+class Command(BaseCommand):
+    help = ('Оставляет в таблице стилей Bootstrap только классы, которые '
+            'встречаются в шаблонах, и встраивает правила первого экрана '
+            'в base.html.')
+
+    def add_arguments(self, parser):
+        static_dir = Path(settings.STATICFILES_DIRS[0])
+        template_dir = Path(settings.TEMPLATES[0]['DIRS'][0])
+        parser.add_argument(
+            '--source', type=Path, default=static_dir / SOURCE_STYLESHEET,
+            help='Полная таблица стилей.'
+        )
+        parser.add_argument(
+            '--output', type=Path, default=static_dir / PURGED_STYLESHEET,
+            help='Куда записать сокращённую таблицу стилей.'
+        )
+        parser.add_argument(
+            '--critical-output', type=Path,
+            default=template_dir / CRITICAL_TEMPLATE,
+            help='Шаблон со встроенными правилами первого экрана.'
+        )
+
+    def handle(self, *args, **options):
+        css = options['source'].read_text(encoding='utf-8')
+        purged = purge(css, used_tokens())
+        options['output'].write_text(purged, encoding='utf-8')
+
+        template_dir = Path(settings.TEMPLATES[0]['DIRS'][0])
+        critical = select(purged, used_tokens(
+            template_dir / name for name in CRITICAL_TEMPLATES))
+        # @charset внутри <style> не действует: кодировку задаёт страница.
+        if critical.startswith('@charset'):
+            critical = critical.split(';', 1)[1]
+        options['critical_output'].write_text(
+            '{% verbatim %}<style>' + critical
+            + '</style>{% endverbatim %}\n',
+            encoding='utf-8'
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Таблица стилей: {len(css)} → {len(purged)} байт, '
+            f'встроено в страницу: {len(critical)} байт.'
+        ))
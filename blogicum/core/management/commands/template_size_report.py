@@ -0,0 +1,77 @@
+import copy
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from django.urls import resolve
+
+from core.pages import get_client, page_mix
+
+MINIFYING_LOADER = 'core.template_loaders.Loader'
+
+
+def empty_cache(name):
+    """Отдельный пустой кеш: страницы и карточки рисуются заново."""
+    return {'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': f'template-size-report-{name}',
+    }}
+
+
+def without_minification(templates):
+    """Настройки TEMPLATES, в которых сжимающий загрузчик снят."""
+    templates = copy.deepcopy(templates)
+    for engine in templates:
+        loaders = engine.get('OPTIONS', {}).get('loaders')
+        if not loaders:
+            continue
+        engine['OPTIONS']['loaders'] = [
+            inner for loader in loaders
+            for inner in (
+                loader[1] if isinstance(loader, (list, tuple))
+                and loader[0] == MINIFYING_LOADER else [loader]
+            )
+        ]
+    return templates
+
+
+class Command(BaseCommand):
+    help = ('Показывает, сколько байт экономит сжатие пробелов в шаблонах '
+            'на страницах блога.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'urls', nargs='*',
+            help='Адреса страниц; по умолчанию лента, категория, '
+                 'публикация и профиль.'
+        )
+
+    def handle(self, *args, **options):
+        urls = options['urls'] or page_mix()
+        with override_settings(CACHES=empty_cache('minified')):
+            minified = self.sizes(urls)
+        with override_settings(
+                CACHES=empty_cache('original'),
+                TEMPLATES=without_minification(settings.TEMPLATES)):
+            original = self.sizes(urls)
+        self.stdout.write('представление              было    стало  экономия')
+        for url in urls:
+            if url not in minified or url not in original:
+                continue
+            saved = original[url] - minified[url]
+            self.stdout.write(
+                f'{resolve(url).view_name:<24} {original[url]:>7} '
+                f'{minified[url]:>8} {saved:>6} '
+                f'({saved / original[url]:.1%})'
+            )
+
+    def sizes(self, urls):
+        client = get_client()
+        sizes = {}
+        for url in urls:
+            response = client.get(url)
+            if response.status_code == 200:
+                sizes[url] = len(response.content)
+            else:
+                self.stderr.write(f'{url}: {response.status_code}')
+        return sizes
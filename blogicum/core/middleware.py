@@ -0,0 +1,97 @@
+from django.conf import settings
+from django.templatetags.static import static
+from django.utils.cache import patch_vary_headers
+
+from .compression import compress, compress_stream, get_level, negotiate
+
+# Типы, которые стоит сжимать; изображения, архивы и шрифты woff2 уже
+# сжаты.
+COMPRESSIBLE_TYPES = (
+    'text/',
+    'application/json',
+    'application/javascript',
+    'application/xml',
+    'image/svg+xml',
+)
+
+
+class PreloadMiddleware:
+    """Заголовок Link: rel=preload для статических файлов из STATIC_PRELOAD.
+
+    Браузер начинает загружать таблицу стилей, ещё не разобрав страницу.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.link = None
+
+    def get_link(self):
+        # Имя файла с хешем известно только после загрузки манифеста.
+        if self.link is None:
+            self.link = ', '.join(
+                f'<{static(path)}>; rel=preload; as={kind}'
+                for path, kind in settings.STATIC_PRELOAD
+            )
+        return self.link
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (
+            response.get('Content-Type', '').startswith('text/html')
+            and 'Link' not in response
+            and settings.STATIC_PRELOAD
+        ):
+            response['Link'] = self.get_link()
+        return response
+
+
+class CompressionMiddleware:
+    """Сжатие ответов в brotli или gzip по Accept-Encoding.
+
+    Потоковые ответы сжимаются по частям, без накопления в памяти.
+    Ответы меньше COMPRESSION_MIN_SIZE байт, уже сжатые ответы и части
+    файлов (206) отдаются как есть.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not self.is_compressible(response):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = negotiate(request.headers.get('Accept-Encoding', ''))
+        if encoding is None:
+            return response
+        level = get_level(encoding)
+        if response.streaming:
+            response.streaming_content = compress_stream(
+                response.streaming_content, encoding, level)
+            del response['Content-Length']
+        else:
+            compressed = compress(response.content, encoding, level)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+        # Сжатое тело не совпадает побайтно с исходным.
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+        return response
+
+    def is_compressible(self, response):
+        content_type = response.get('Content-Type', '')
+        if (
+            response.status_code != 200
+            or response.has_header('Content-Encoding')
+            or not content_type.startswith(COMPRESSIBLE_TYPES)
+        ):
+            return False
+        if response.streaming:
+            length = response.get('Content-Length')
+            return length is None or int(length) >= (
+                settings.COMPRESSION_MIN_SIZE)
+        return len(response.content) >= settings.COMPRESSION_MIN_SIZE
@@ -24,3 +24,15 @@ class CreatedAtModel(models.Model):
 
     class Meta:
         abstract = True
+
+
+class UpdatedAtModel(models.Model):
+    """Абстрактная модель. Добавляет поле updated_at."""
+
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name="Изменено"
+    )
+
+    class Meta:
+        abstract = True
@@ -0,0 +1,26 @@
+"""Типичные страницы блога для замеров размера ответов."""
+from django.contrib.auth import get_user_model
+from django.test import Client
+from django.urls import reverse
+
+from blog.models import Category, Post
+
+
+def page_mix():
+    """Адреса типичных страниц: лента, категория, публикация, профиль."""
+    urls = [reverse('blog:index')]
+    category = Category.objects.filter(is_published=True).first()
+    if category is not None:
+        urls.append(reverse('blog:category_posts', args=[category.slug]))
+    post = Post.objects.filter(is_published=True).first()
+    if post is not None:
+        urls.append(reverse('blog:post_detail', args=[post.pk]))
+    user = get_user_model().objects.first()
+    if user is not None:
+        urls.append(reverse('blog:profile', args=[user.username]))
+    return urls
+
+
+def get_client():
+    # Адрес не из INTERNAL_IPS: панель отладки не попадает в замер.
+    return Client(HTTP_HOST='localhost', REMOTE_ADDR='192.0.2.1')
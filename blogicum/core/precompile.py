@@ -0,0 +1,50 @@
+"""Компиляция всех шаблонов проекта заранее.
+
+В рабочем режиме шаблоны хранит cached.Loader, и при запуске процесса
+они компилируются все сразу: первый запрос не тратит время на
+компиляцию, а ошибка в любом шаблоне не даёт процессу запуститься.
+"""
+import time
+from pathlib import Path
+
+from django.core.exceptions import ImproperlyConfigured
+from django.template import Node, engines
+
+
+def project_templates():
+    """Имена шаблонов из каталогов DIRS всех движков Django."""
+    for backend in engines.all():
+        engine = getattr(backend, 'engine', None)
+        if engine is None:
+            continue
+        for directory in engine.dirs:
+            directory = Path(directory)
+            for path in sorted(directory.rglob('*')):
+                if path.is_file():
+                    yield engine, path.relative_to(directory).as_posix()
+
+
+def compile_templates():
+    """Компилирует шаблоны проекта: [(имя, секунды, узлы, ошибка)]."""
+    results = []
+    for engine, name in project_templates():
+        started = time.perf_counter()
+        try:
+            template = engine.get_template(name)
+        except Exception as error:
+            results.append((name, time.perf_counter() - started, 0, error))
+            continue
+        nodes = len(template.nodelist.get_nodes_by_type(Node))
+        results.append((name, time.perf_counter() - started, nodes, None))
+    return results
+
+
+def precompile():
+    """Компилирует шаблоны при запуске процесса; ошибка прерывает запуск."""
+    errors = [
+        f'{name}: {error}'
+        for name, _, _, error in compile_templates() if error is not None
+    ]
+    if errors:
+        raise ImproperlyConfigured(
+            'Не удалось скомпилировать шаблоны:\n' + '\n'.join(errors))
@@ -0,0 +1,101 @@
+"""Статические файлы с хешем в имени и заранее сжатыми копиями.
+
+collectstatic складывает файлы под именами с хешем содержимого
+(ManifestStaticFilesStorage) и рядом пишет их копии .gz и, если
+установлен пакет brotli, .br. serve отдаёт сжатую копию, которую
+принимает браузер, а файлы с хешем в имени кешируются навсегда.
+"""
+import gzip
+import mimetypes
+import os
+import posixpath
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.utils.cache import (get_conditional_response, patch_cache_control,
+                                patch_vary_headers)
+from django.views.decorators.http import require_safe
+
+from .compression import brotli, negotiate
+from .files import file_etag, file_response, resolve, set_validators
+
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.svg', '.json', '.txt', '.map',
+                           '.ico', '.xml', '.html')
+MIN_COMPRESS_SIZE = 256
+HASHED_NAME_RE = re.compile(r'.+\.[0-9a-f]{12}(\.\w+)?')
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+STATIC_MAX_AGE = 3600
+# Расширение сжатой копии и значение Content-Encoding по предпочтению.
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def compress(content):
+    """Сжатые копии содержимого: {расширение: байты}, если они меньше."""
+    variants = {'.gz': gzip.compress(content, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['.br'] = brotli.compress(content, quality=11)
+    return {
+        extension: data for extension, data in variants.items()
+        if len(data) < len(content)
+    }
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Манифест имён с хешем и сжатые копии файлов с хешем в имени."""
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for name in self.hashed_files.values():
+            if name.endswith(COMPRESSIBLE_EXTENSIONS):
+                self.write_compressed(name)
+
+    def write_compressed(self, name):
+        with self.open(name) as file:
+            content = file.read()
+        if len(content) < MIN_COMPRESS_SIZE:
+            return
+        for extension, data in compress(content).items():
+            with open(self.path(name + extension), 'wb') as file:
+                file.write(data)
+
+
+def accepted_variant(request, full_path):
+    """Сжатая копия, которую принимает клиент: (путь, кодировка)."""
+    encoding = negotiate(
+        request.headers.get('Accept-Encoding', ''),
+        [encoding for encoding, extension in ENCODINGS
+         if os.path.isfile(full_path + extension)]
+    )
+    if encoding is None:
+        return full_path, None
+    return full_path + dict(ENCODINGS)[encoding], encoding
+
+
+@require_safe
+def serve(request, path):
+    """Файл из STATIC_ROOT, по возможности в сжатой копии."""
+    path, full_path, _ = resolve(settings.STATIC_ROOT, path)
+    content_type = mimetypes.guess_type(full_path)[0] or (
+        'application/octet-stream')
+    body_path, encoding = accepted_variant(request, full_path)
+    stat = os.stat(body_path)
+    etag = file_etag(stat)
+    last_modified = int(stat.st_mtime)
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = file_response(
+            request, body_path, stat, etag, last_modified,
+            content_type=content_type, encoding=encoding)
+    set_validators(response, etag, last_modified)
+    response['Accept-Ranges'] = 'bytes'
+    patch_vary_headers(response, ('Accept-Encoding',))
+    if HASHED_NAME_RE.fullmatch(posixpath.basename(path)):
+        patch_cache_control(
+            response, public=True, max_age=IMMUTABLE_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(response, public=True, max_age=STATIC_MAX_AGE)
+    return response
@@ -0,0 +1,64 @@
+"""Загрузчик шаблонов, убирающий лишние пробелы при компиляции.
+
+Отступы и переводы строк между тегами сворачиваются один раз, когда
+шаблон загружается, а не в каждом ответе; содержимое <pre> и <textarea>
+не трогается. Сжимаются только шаблоны проекта (каталоги DIRS):
+шаблоны сторонних приложений бывают текстовыми, например письма.
+"""
+import re
+from pathlib import Path
+
+from django.template import Origin
+from django.template.loaders.base import Loader as BaseLoader
+
+PRESERVED_RE = re.compile(r'<(pre|textarea)\b.*?</\1\s*>', re.S | re.I)
+# Пробелы, среди которых есть перевод строки, заменяются одним переводом
+# строки: для разметки это тот же пробел, а скрипты сохраняют строки.
+WHITESPACE_RE = re.compile(r'[ \t\r\f\v]*\n\s*')
+
+
+def minify(source):
+    parts, position = [], 0
+    for match in PRESERVED_RE.finditer(source):
+        parts.append(WHITESPACE_RE.sub('\n', source[position:match.start()]))
+        parts.append(match.group())
+        position = match.end()
+    parts.append(WHITESPACE_RE.sub('\n', source[position:]))
+    return ''.join(parts)
+
+
+class Loader(BaseLoader):
+    """Оборачивает загрузчики loaders и сжимает шаблоны из DIRS."""
+
+    def __init__(self, engine, loaders):
+        super().__init__(engine)
+        self.loaders = engine.get_template_loaders(loaders)
+        self.dirs = [Path(directory).resolve() for directory in engine.dirs]
+
+    def get_template_sources(self, template_name):
+        # Источники отдаются от имени этого загрузчика: cached.Loader читает
+        # шаблон через origin.loader, и сжатие не должно пропускаться.
+        for loader in self.loaders:
+            for source in loader.get_template_sources(template_name):
+                origin = Origin(
+                    name=source.name,
+                    template_name=source.template_name,
+                    loader=self,
+                )
+                origin.source_loader = source.loader
+                yield origin
+
+    def get_contents(self, origin):
+        contents = origin.source_loader.get_contents(origin)
+        if self.is_project_template(origin):
+            return minify(contents)
+        return contents
+
+    def is_project_template(self, origin):
+        path = Path(origin.name).resolve()
+        return any(directory in path.parents for directory in self.dirs)
+
+    def reset(self):
+        for loader in self.loaders:
+            if hasattr(loader, 'reset'):
+                loader.reset()
@@ -0,0 +1,22 @@
+// Подгрузка следующих страниц комментариев без перезагрузки страницы.
+document.addEventListener('click', function (event) {
+  var link = event.target.closest('[data-comments-more]');
+  if (!link) {
+    return;
+  }
+  event.preventDefault();
+  link.classList.add('disabled');
+  fetch(link.href, {credentials: 'same-origin'})
+    .then(function (response) {
+      if (!response.ok) {
+        throw new Error(response.statusText);
+      }
+      return response.text();
+    })
+    .then(function (html) {
+      link.parentElement.outerHTML = html;
+    })
+    .catch(function () {
+      link.classList.remove('disabled');
+    });
+});
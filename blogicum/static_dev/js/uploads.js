@@ -0,0 +1,79 @@
+// Загрузка фотографии по частям с продолжением после обрыва связи.
+(function () {
+  var MAX_ATTEMPTS = 5;
+
+  function csrfToken(form) {
+    return form.querySelector('[name=csrfmiddlewaretoken]').value;
+  }
+
+  function request(method, url, form, options) {
+    options = options || {};
+    var headers = Object.assign({'X-CSRFToken': csrfToken(form)}, options.headers);
+    return fetch(url, {
+      method: method, body: options.body, headers: headers, credentials: 'same-origin'
+    }).then(function (response) {
+      return response.json().then(function (data) {
+        if (!response.ok && response.status !== 409) {
+          throw new Error(data.error || response.statusText);
+        }
+        return data;
+      });
+    });
+  }
+
+  function sendChunks(form, file, url, offset, chunkSize, attempt) {
+    if (offset >= file.size) {
+      return Promise.resolve();
+    }
+    var end = Math.min(offset + chunkSize, file.size);
+    return request('PUT', url, form, {
+      body: file.slice(offset, end),
+      headers: {'Content-Range': 'bytes ' + offset + '-' + (end - 1) + '/' + file.size}
+    }).then(function (data) {
+      return sendChunks(form, file, url, data.offset, chunkSize, 0);
+    }, function (error) {
+      if (attempt >= MAX_ATTEMPTS) {
+        throw error;
+      }
+      // Узнаём, сколько байт сервер успел принять, и продолжаем с них.
+      return new Promise(function (resolve) {
+        setTimeout(resolve, 1000 * Math.pow(2, attempt));
+      }).then(function () {
+        return request('GET', url, form);
+      }).then(function (data) {
+        return sendChunks(form, file, url, data.offset, chunkSize, attempt + 1);
+      }, function () {
+        return sendChunks(form, file, url, offset, chunkSize, attempt + 1);
+      });
+    });
+  }
+
+  document.addEventListener('submit', function (event) {
+    var form = event.target;
+    var input = form.querySelector('input[type=file][name=image]');
+    if (!form.dataset.uploadUrl || !input || !input.files.length) {
+      return;
+    }
+    var file = input.files[0];
+    if (file.size <= Number(form.dataset.chunkSize)) {
+      return;
+    }
+    event.preventDefault();
+    var body = new FormData();
+    body.append('filename', file.name);
+    body.append('size', file.size);
+    request('POST', form.dataset.uploadUrl, form, {body: body})
+      .then(function (data) {
+        var url = form.dataset.uploadUrl + data.id + '/';
+        return sendChunks(form, file, url, data.offset, data.chunk_size, 0)
+          .then(function () {
+            form.querySelector('[name=image_upload]').value = data.id;
+            input.value = '';
+            form.submit();
+          });
+      })
+      .catch(function (error) {
+        alert('Не удалось загрузить фотографию: ' + error.message);
+      });
+  });
+})();
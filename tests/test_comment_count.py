@@ -0,0 +1,101 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _count(post):
+    post.refresh_from_db(fields=["comment_count"])
+    return post.comment_count
+
+
+def test_comment_count_follows_comments(
+        mixer: Mixer, user, post_with_published_location, post_of_another_author
+):
+    post = post_with_published_location
+    comments = mixer.cycle(3).blend("blog.Comment", post=post, author=user)
+    assert _count(post) == 3, (
+        "Убедитесь, что счётчик комментариев увеличивается при добавлении "
+        "комментария."
+    )
+
+    comments[0].delete()
+    assert _count(post) == 2, (
+        "Убедитесь, что счётчик комментариев уменьшается при удалении "
+        "комментария."
+    )
+
+    moved = type(comments[1]).objects.get(pk=comments[1].pk)
+    moved.post = post_of_another_author
+    moved.save()
+    assert (_count(post), _count(post_of_another_author)) == (1, 1), (
+        "Убедитесь, что при переносе комментария счётчики обеих публикаций "
+        "обновляются."
+    )
+
+
+def test_recount_comments_repairs_drift(
+        mixer: Mixer, client, user, post_with_published_location
+):
+    post = post_with_published_location
+    mixer.cycle(2).blend("blog.Comment", post=post, author=user)
+    type(post).objects.filter(pk=post.pk).update(comment_count=7)
+    assert "Комментарии (7)" in client.get("/").content.decode()
+
+    call_command("recount_comments", chunk_size=1)
+
+    assert _count(post) == 2, (
+        "Убедитесь, что команда `recount_comments` восстанавливает "
+        "счётчики комментариев."
+    )
+    assert "Комментарии (2)" in client.get("/").content.decode(), (
+        "Убедитесь, что после пересчёта лента показывает исправленный "
+        "счётчик."
+    )
+
+
+def test_admin_edit_keeps_count(
+        mixer: Mixer, admin_client, user, post_with_published_location,
+        post_of_another_author
+):
+    post = post_with_published_location
+    comment = mixer.blend("blog.Comment", post=post, author=user)
+    url = f"/admin/blog/comment/{comment.pk}/change/"
+    assert admin_client.get(url).status_code == 200, (
+        "Убедитесь, что комментарий открывается для правки в админке."
+    )
+    response = admin_client.post(url, {
+        "text": "Исправленный текст",
+        "post": post_of_another_author.pk,
+        "author": user.pk,
+        "is_published": "on",
+    })
+    assert response.status_code == 302, (
+        "Убедитесь, что правка комментария в админке сохраняется."
+    )
+    comment.refresh_from_db()
+    assert comment.text == "Исправленный текст"
+    assert (_count(post), _count(post_of_another_author)) == (0, 1), (
+        "Убедитесь, что при переносе комментария в админке счётчики "
+        "публикаций обновляются."
+    )
+
+
+def test_post_delete_does_not_touch_each_comment(
+        mixer: Mixer, user, published_category
+):
+    def delete_queries(n_comments):
+        post = mixer.blend(
+            "blog.Post", author=user, category=published_category, image="")
+        mixer.cycle(n_comments).blend("blog.Comment", post=post, author=user)
+        with CaptureQueriesContext(connection) as context:
+            post.delete()
+        return len(context.captured_queries)
+
+    assert delete_queries(20) == delete_queries(2), (
+        "Убедитесь, что при удалении публикации её комментарии не "
+        "обрабатываются по одному."
+    )
@@ -0,0 +1,90 @@
+import re
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog.consts import COMMENTS_ON_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+MORE_LINK = re.compile(r'href="([^"]+)" data-comments-more')
+
+
+@pytest.fixture
+def many_comments(mixer: Mixer, another_user, post_with_published_location):
+    same_date = timezone.now() - timedelta(days=1)
+    dates = [same_date] * 5 + [
+        timezone.now() - timedelta(hours=hour)
+        for hour in range(COMMENTS_ON_PAGE * 2, 0, -1)
+    ]
+    comments = mixer.cycle(len(dates)).blend(
+        "blog.Comment",
+        post=post_with_published_location,
+        author=another_user,
+        text=(f"Комментарий номер {i}." for i in range(len(dates))),
+    )
+    for comment, date in zip(comments, dates):
+        comment.created_at = date
+        comment.save()
+    return sorted(comments, key=lambda comment: (comment.created_at,
+                                                 comment.id))
+
+
+def _comment_texts(content):
+    return re.findall(r"Комментарий номер \d+\.", content)
+
+
+def test_comments_are_paginated(
+        client, post_with_published_location, many_comments
+):
+    response = client.get(f"/posts/{post_with_published_location.id}/")
+    content = response.content.decode()
+    texts = _comment_texts(content)
+    assert len(texts) == COMMENTS_ON_PAGE, (
+        "Убедитесь, что на странице публикации выводится только первая "
+        "страница комментариев."
+    )
+    while True:
+        link = MORE_LINK.search(content)
+        if not link:
+            break
+        response = client.get(link[1].replace("&amp;", "&"))
+        assert response.status_code == 200
+        content = response.content.decode()
+        assert "<html" not in content, (
+            "Убедитесь, что следующие страницы комментариев отдаются "
+            "фрагментом без обёртки страницы."
+        )
+        texts += _comment_texts(content)
+    assert texts == [comment.text for comment in many_comments], (
+        "Убедитесь, что комментарии подгружаются по порядку, без пропусков "
+        "и повторов."
+    )
+
+
+def test_comment_fragment_respects_visibility(
+        client, user_client, post_with_published_location, many_comments
+):
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+    url = f"/posts/{post.id}/comments/more/"
+    assert client.get(url).status_code == 404
+    assert user_client.get(url).status_code == 200
+
+
+def test_comment_fragment_ignores_page_numbers(
+        client, post_with_published_location, many_comments
+):
+    url = f"/posts/{post_with_published_location.id}/comments/more/"
+    content = client.get(f"{url}?page=1").content.decode()
+    link = MORE_LINK.search(content)
+    assert link and "cursor=&" not in link[1] + "&", (
+        "Убедитесь, что фрагмент комментариев листается только по курсору: "
+        "ссылка «Показать ещё» не должна вести на первую страницу."
+    )
+    texts = _comment_texts(content)
+    texts += _comment_texts(client.get(link[1]).content.decode())
+    assert len(set(texts)) == len(texts)
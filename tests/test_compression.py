@@ -0,0 +1,88 @@
+import gzip
+import zlib
+
+import pytest
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory
+
+from core.compression import negotiate
+from core.middleware import CompressionMiddleware
+
+HTML = ("<p>" + "Лента публикаций " * 200 + "</p>").encode()
+
+
+def _middleware(response):
+    return CompressionMiddleware(lambda request: response)
+
+
+def _request(accept_encoding="gzip, deflate"):
+    return RequestFactory().get("/", HTTP_ACCEPT_ENCODING=accept_encoding)
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip, deflate", "gzip"),
+    ("gzip;q=0, deflate", None),
+    ("identity", None),
+    ("*", "gzip"),
+    ("", None),
+])
+def test_negotiation(header, expected):
+    assert negotiate(header) in (expected, "br" if expected else None)
+
+
+@pytest.mark.django_db
+def test_pages_are_compressed(client):
+    response = client.get("/", HTTP_ACCEPT_ENCODING="gzip")
+    assert response["Content-Encoding"] == "gzip", (
+        "Убедитесь, что HTML-страницы сжимаются для клиентов с gzip."
+    )
+    assert "Accept-Encoding" in response["Vary"]
+    assert b"<html" in gzip.decompress(response.content)
+
+
+def test_streaming_is_compressed_incrementally():
+    chunks = [HTML, HTML]
+    response = _middleware(
+        StreamingHttpResponse(iter(chunks), content_type="text/html")
+    )(_request())
+    assert response["Content-Encoding"] == "gzip"
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    first = next(iter(response.streaming_content))
+    assert decompressor.decompress(first) == HTML, (
+        "Убедитесь, что каждая часть потокового ответа сжимается и "
+        "отдаётся сразу, без накопления."
+    )
+
+
+@pytest.mark.parametrize("response", [
+    HttpResponse(b"<p>short</p>", content_type="text/html"),
+    HttpResponse(HTML, content_type="image/jpeg"),
+    HttpResponse(HTML, content_type="text/css", headers={
+        "Content-Encoding": "br"}),
+    HttpResponse(HTML, status=206, content_type="text/html"),
+], ids=["small", "image", "encoded", "partial"])
+def test_skipped_responses(response):
+    body = response.content
+    response = _middleware(response)(_request())
+    assert response.content == body
+    assert response.get("Content-Encoding") in (None, "br")
+
+
+@pytest.mark.django_db
+def test_pages_are_compressed_with_brotli(client):
+    brotli = pytest.importorskip("brotli")
+    response = client.get("/", HTTP_ACCEPT_ENCODING="gzip, br")
+    assert response["Content-Encoding"] == "br", (
+        "Убедитесь, что клиентам с brotli страницы сжимаются в br."
+    )
+    assert b"<html" in brotli.decompress(response.content)
+
+
+def test_brotli_streaming_round_trip():
+    brotli = pytest.importorskip("brotli")
+    response = _middleware(
+        StreamingHttpResponse(iter([HTML, HTML]), content_type="text/html")
+    )(_request("br"))
+    assert response["Content-Encoding"] == "br"
+    body = b"".join(response.streaming_content)
+    assert brotli.decompress(body) == HTML + HTML
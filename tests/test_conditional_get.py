@@ -0,0 +1,63 @@
+from http import HTTPStatus
+
+import pytest
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def conditional_urls(published_category, post_with_published_location):
+    return (
+        "/",
+        f"/category/{published_category.slug}/",
+        f"/posts/{post_with_published_location.id}/",
+    )
+
+
+@pytest.mark.parametrize("client_name", ["client", "user_client"])
+def test_not_modified_until_content_changes(
+        request, client_name, mixer: Mixer, another_user, conditional_urls,
+        post_with_published_location
+):
+    client = request.getfixturevalue(client_name)
+    validators = {}
+    for url in conditional_urls:
+        response = client.get(url)
+        assert response.has_header("ETag") and response.has_header(
+            "Last-Modified"), (
+            f"Убедитесь, что страница `{url}` отдаёт ETag и Last-Modified."
+        )
+        validators[url] = response["ETag"]
+        response = client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f"Убедитесь, что неизменившаяся страница `{url}` отдаёт 304."
+        )
+
+    mixer.blend(
+        "blog.Comment", post=post_with_published_location,
+        author=another_user
+    )
+    for url, etag in validators.items():
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            f"Убедитесь, что после нового комментария страница `{url}` "
+            "отдаётся заново."
+        )
+
+
+def test_new_csrf_secret_invalidates_etag(
+        client, user, post_with_published_location
+):
+    url = f"/posts/{post_with_published_location.id}/"
+    client.force_login(user)
+    client.get(url)
+    etag = client.get(url)["ETag"]
+    client.logout()
+    client.force_login(user)
+    client.get(url)
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK, (
+        "Убедитесь, что после нового входа страница отдаётся заново: "
+        "в форме на ней должен быть новый CSRF-токен."
+    )
@@ -0,0 +1,47 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_excerpt_follows_text(post_with_published_location):
+    post = post_with_published_location
+    post.text = " ".join(f"слово{i}" for i in range(30))
+    post.save(update_fields=["text"])
+    post.refresh_from_db()
+    assert post.excerpt == " ".join(f"слово{i}" for i in range(10)) + " …", (
+        "Убедитесь, что начало текста публикации обновляется вместе "
+        "с текстом."
+    )
+
+
+def test_feeds_do_not_load_full_rows(
+        client, user, published_category, post_with_published_location
+):
+    urls = (
+        "/",
+        f"/category/{published_category.slug}/",
+        f"/profile/{user.username}/",
+    )
+    for url in urls:
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert post_with_published_location.excerpt in (
+            response.content.decode()
+        )
+        feed_queries = [
+            query["sql"] for query in context.captured_queries
+            if 'FROM "blog_post"' in query["sql"]
+            and '"blog_post"."title"' in query["sql"]
+        ]
+        assert feed_queries
+        for sql in feed_queries:
+            assert '"blog_post"."text"' not in sql, (
+                f"Убедитесь, что лента `{url}` не загружает полный текст "
+                "публикаций."
+            )
+            assert '"auth_user"."password"' not in sql, (
+                f"Убедитесь, что лента `{url}` загружает из связанных "
+                "таблиц только нужные карточке колонки."
+            )
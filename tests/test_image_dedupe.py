@@ -0,0 +1,104 @@
+import os
+import time
+from io import BytesIO
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from mixer.backend.django import Mixer
+from PIL import Image
+
+from blog.models import ImageBlob, ImageVariant, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _jpeg(color):
+    buffer = BytesIO()
+    Image.new("RGB", (40, 30), color=color).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def storage():
+    return Post._meta.get_field("image").storage
+
+
+def test_identical_images_are_stored_once(
+        django_capture_on_commit_callbacks, mixer: Mixer, user,
+        published_category, storage
+):
+    content = _jpeg((1, 2, 3))
+    with django_capture_on_commit_callbacks(execute=True):
+        posts = [
+            mixer.blend(
+                "blog.Post", author=user, category=published_category,
+                image=ContentFile(content, name=f"repost_{i}.JPG")
+            )
+            for i in range(2)
+        ]
+    name = posts[0].image.name
+    assert posts[1].image.name == name and storage.exists(name), (
+        "Убедитесь, что одинаковые фотографии хранятся одним файлом."
+    )
+    assert ImageBlob.objects.get(name=name).refcount == 2
+    assert ImageVariant.objects.filter(source=name).exists()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        posts[0].delete()
+    assert storage.exists(name)
+    assert ImageBlob.objects.get(name=name).refcount == 1
+
+    with django_capture_on_commit_callbacks(execute=True):
+        posts[1].image = None
+        posts[1].save()
+    assert not ImageBlob.objects.filter(name=name).exists()
+    assert storage.exists(name), (
+        "Убедитесь, что файл без ссылок удаляет только "
+        "collect_media_garbage по истечении льготного срока: новая "
+        "загрузка того же файла могла его уже переиспользовать."
+    )
+
+    reposted = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        image=ContentFile(content, name="repost_again.jpg")
+    )
+    assert reposted.image.name == name and storage.exists(name)
+    assert ImageBlob.objects.get(name=name).refcount == 1
+
+    reposted.delete()
+    moment = time.time() - 2 * 24 * 3600
+    os.utime(storage.path(name), (moment, moment))
+    call_command("collect_media_garbage", grace_hours=24)
+    assert not storage.exists(name), (
+        "Убедитесь, что файл, на который не ссылается ни одна публикация, "
+        "удаляется по истечении льготного срока."
+    )
+
+
+def test_dedupe_command(mixer: Mixer, user, published_category, storage):
+    content = _jpeg((4, 5, 6))
+    legacy_names = [
+        storage.path(f"posts_images/legacy_{i}.jpg") for i in range(2)
+    ]
+    os.makedirs(os.path.dirname(legacy_names[0]), exist_ok=True)
+    for path in legacy_names:
+        with open(path, "wb") as file:
+            file.write(content)
+    posts = mixer.cycle(2).blend(
+        "blog.Post", author=user, category=published_category)
+    for post, path in zip(posts, legacy_names):
+        Post.objects.filter(pk=post.pk).update(
+            image=f"posts_images/{os.path.basename(path)}")
+
+    call_command("dedupe_images")
+    names = set(Post.objects.values_list("image", flat=True))
+    assert len(names) == 1, (
+        "Убедитесь, что команда заменяет одинаковые фотографии одним файлом."
+    )
+    name = names.pop()
+    assert storage.exists(name)
+    assert not any(os.path.exists(path) for path in legacy_names)
+    assert ImageBlob.objects.get(name=name).refcount == 2
+    with storage.open(name) as file:
+        assert file.read() == content
@@ -0,0 +1,110 @@
+from io import BytesIO
+
+import pytest
+from bs4 import BeautifulSoup
+from django.core.files.images import ImageFile
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import Mixer
+from PIL import Image
+
+from blog.consts import IMAGE_SIZES
+from blog.images import get_formats
+from blog.models import ImageVariant
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def large_image_post(mixer: Mixer, user, published_category):
+    img_io = BytesIO()
+    Image.new("RGB", (2000, 1000), color=(73, 109, 137)).save(
+        img_io, format="JPEG")
+    return mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, image=ImageFile(img_io, name="large_image.jpg")
+    )
+
+
+def test_variants_are_built_after_commit(
+        django_capture_on_commit_callbacks, mixer: Mixer, user,
+        published_category
+):
+    img_io = BytesIO()
+    Image.new("RGB", (2000, 1000)).save(img_io, format="JPEG")
+    with django_capture_on_commit_callbacks(execute=True):
+        post = mixer.blend(
+            "blog.Post", author=user, category=published_category,
+            image=ImageFile(img_io, name="committed_image.jpg")
+        )
+    variants = ImageVariant.objects.filter(source=post.image.name)
+    assert {
+        (variant.size, variant.format) for variant in variants
+    } == {(size, fmt) for size in IMAGE_SIZES for fmt in get_formats()}, (
+        "Убедитесь, что копии изображения строятся после сохранения "
+        "публикации во всех поддерживаемых форматах."
+    )
+    assert "webp" in get_formats()
+    for variant in variants:
+        box_width, box_height = IMAGE_SIZES[variant.size]
+        assert variant.width <= box_width and variant.height <= box_height
+        assert variant.width == 2 * variant.height
+
+
+def test_backfill_and_templates(client, large_image_post):
+    # Потоки команды не видят данные незавершённой транзакции теста.
+    call_command("build_image_variants", workers=1)
+    card = ImageVariant.objects.get(
+        source=large_image_post.image.name, size="card", format="jpeg")
+    assert (card.width, card.height) == (640, 320)
+    webp = ImageVariant.objects.get(
+        source=large_image_post.image.name, size="card", format="webp")
+    assert webp.file.name.endswith(".webp")
+
+    response = client.get("/")
+    picture = BeautifulSoup(
+        response.content.decode(), features="html.parser"
+    ).find("img", src=card.file.url).find_parent("picture")
+    assert picture is not None, (
+        "Убедитесь, что копии изображения выводятся в элементе <picture>."
+    )
+    img = picture.find("img")
+    assert img["width"] == "640" and img["loading"] == "lazy", (
+        "Убедитесь, что в ленте выводится копия изображения для карточки "
+        "с указанными размерами и отложенной загрузкой."
+    )
+    assert f"{card.file.url} 640w" in img["srcset"] and img["sizes"]
+    source = picture.find("source", type="image/webp")
+    assert source is not None and webp.file.url in source["srcset"], (
+        "Убедитесь, что браузеру предлагается копия в формате WebP."
+    )
+    assert large_image_post.image.url in response.content.decode(), (
+        "Убедитесь, что ссылка на исходное изображение сохранилась."
+    )
+
+
+def test_admin_thumbnails_are_prefetched(
+        admin_client, mixer: Mixer, user, published_category
+):
+    def changelist_queries():
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.get("/admin/blog/post/")
+        assert response.status_code == 200
+        return len(context.captured_queries)
+
+    def blend_posts(prefix, count):
+        for post in mixer.cycle(count).blend(
+                "blog.Post", author=user, category=published_category,
+                image=mixer.sequence(prefix + "_{0}.jpg")):
+            mixer.blend(
+                "blog.ImageVariant", source=post.image.name, size="thumb",
+                format="jpeg", file=f"variants/{post.image.name}")
+
+    blend_posts("first", 1)
+    one_post = changelist_queries()
+    blend_posts("more", 4)
+    assert changelist_queries() == one_post, (
+        "Убедитесь, что миниатюры в списке публикаций админки загружаются "
+        "одним запросом, а не отдельным запросом для каждой публикации."
+    )
@@ -0,0 +1,81 @@
+import os
+import time
+from io import BytesIO
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from mixer.backend.django import Mixer
+from PIL import Image
+
+from blog.models import ChunkedUpload, Post
+
+pytestmark = [pytest.mark.django_db]
+
+DAY = 24 * 3600
+
+
+def _jpeg(color):
+    buffer = BytesIO()
+    Image.new("RGB", (40, 30), color=color).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def storage():
+    return Post._meta.get_field("image").storage
+
+
+def _orphan(storage, name, age):
+    path = storage.path(name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as file:
+        file.write(_jpeg((1, 1, 1)))
+    moment = time.time() - age
+    os.utime(path, (moment, moment))
+    return path
+
+
+def test_orphans_older_than_grace_are_removed(
+        mixer: Mixer, user, published_category, storage
+):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        image=ContentFile(_jpeg((20, 30, 40)), name="kept.jpg")
+    )
+    kept = storage.path(post.image.name)
+    moment = time.time() - 2 * DAY
+    os.utime(kept, (moment, moment))
+    old = _orphan(storage, "posts_images/00/00/gc_old.jpg", 2 * DAY)
+    fresh = _orphan(storage, "posts_images/00/00/gc_fresh.jpg", 60)
+
+    call_command("collect_media_garbage", grace_hours=24)
+    assert not os.path.exists(old), (
+        "Убедитесь, что команда удаляет файлы, на которые не ссылается ни "
+        "одна публикация."
+    )
+    assert os.path.exists(fresh), (
+        "Убедитесь, что команда не трогает файлы моложе льготного срока."
+    )
+    assert os.path.exists(kept), (
+        "Убедитесь, что команда не удаляет фотографии публикаций."
+    )
+    os.remove(fresh)
+
+
+def test_quarantine_and_stale_uploads(user, storage, tmp_path):
+    old = _orphan(storage, "posts_images/00/00/gc_quarantine.jpg", 2 * DAY)
+    upload = ChunkedUpload.objects.create(
+        user=user, filename="stale.jpg", size=10)
+    ChunkedUpload.objects.filter(pk=upload.pk).update(
+        created_at=upload.created_at.replace(year=2000))
+
+    call_command("collect_media_garbage", quarantine=str(tmp_path))
+    assert not os.path.exists(old)
+    assert (tmp_path / "posts_images/00/00/gc_quarantine.jpg").exists(), (
+        "Убедитесь, что с параметром --quarantine файлы переносятся, "
+        "а не удаляются."
+    )
+    assert not ChunkedUpload.objects.exists(), (
+        "Убедитесь, что команда удаляет брошенные загрузки по частям."
+    )
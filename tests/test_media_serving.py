@@ -0,0 +1,74 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.base import ContentFile
+from mixer.backend.django import Mixer
+from PIL import Image
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def image_post(mixer: Mixer, user, published_category):
+    buffer = BytesIO()
+    Image.new("RGB", (40, 30), color=(50, 60, 70)).save(
+        buffer, format="JPEG")
+    return mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        image=ContentFile(buffer.getvalue(), name="served.jpg")
+    )
+
+
+def _body(response):
+    return b"".join(response.streaming_content)
+
+
+def test_full_file_and_validators(client, image_post):
+    content = image_post.image.read()
+    response = client.get(image_post.image.url)
+    assert response.status_code == 200 and _body(response) == content, (
+        "Убедитесь, что загруженные файлы отдаются по MEDIA_URL."
+    )
+    assert response["Content-Type"] == "image/jpeg"
+    assert "immutable" in response["Cache-Control"], (
+        "Убедитесь, что файлы с именем по хешу содержимого кешируются "
+        "навсегда."
+    )
+    assert client.get(
+        image_post.image.url, HTTP_IF_NONE_MATCH=response["ETag"]
+    ).status_code == 304
+    assert client.get(
+        image_post.image.url,
+        HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+    ).status_code == 304
+
+
+def test_byte_ranges(client, image_post):
+    content = image_post.image.read()
+    size = len(content)
+    response = client.get(image_post.image.url, HTTP_RANGE="bytes=10-19")
+    assert response.status_code == 206 and _body(response) == content[10:20], (
+        "Убедитесь, что поддерживаются запросы диапазона байт."
+    )
+    assert response["Content-Range"] == f"bytes 10-19/{size}"
+    assert response["Content-Length"] == "10"
+    response = client.get(image_post.image.url, HTTP_RANGE="bytes=-5")
+    assert _body(response) == content[-5:]
+    response = client.get(
+        image_post.image.url, HTTP_RANGE=f"bytes={size}-")
+    assert response.status_code == 416
+    response = client.get(
+        image_post.image.url, HTTP_RANGE="bytes=0-4",
+        HTTP_IF_RANGE='"stale"')
+    assert response.status_code == 200
+
+
+def test_offload_and_traversal(client, settings, image_post):
+    settings.MEDIA_SENDFILE = "x-accel-redirect"
+    response = client.get(image_post.image.url)
+    assert response["X-Accel-Redirect"] == (
+        "/protected-media/" + image_post.image.name), (
+        "Убедитесь, что отдачу файла можно передать nginx."
+    )
+    assert response.content == b""
+    assert client.get("/media/../manage.py").status_code == 404
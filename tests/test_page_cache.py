@@ -0,0 +1,203 @@
+import pytest
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _queries_for(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(context.captured_queries), response
+
+
+@pytest.fixture
+def cached_urls(user, published_category, post_with_published_location):
+    return (
+        "/",
+        f"/category/{published_category.slug}/",
+        f"/profile/{user.username}/",
+    )
+
+
+def test_anonymous_pages_are_cached(client, cached_urls):
+    for url in cached_urls:
+        _queries_for(client, url)
+        n_queries, _ = _queries_for(client, url)
+        assert n_queries == 0, (
+            f"Убедитесь, что страница `{url}` для анонимных читателей "
+            "отдаётся из кеша."
+        )
+
+
+def test_cached_pages_are_invalidated(
+        mixer: Mixer, client, another_user, cached_urls,
+        post_with_published_location
+):
+    for url in cached_urls:
+        _queries_for(client, url)
+
+    mixer.blend(
+        "blog.Comment", post=post_with_published_location,
+        author=another_user
+    )
+    for url in cached_urls:
+        n_queries, response = _queries_for(client, url)
+        assert n_queries and "Комментарии (1)" in response.content.decode(), (
+            f"Убедитесь, что кеш страницы `{url}` сбрасывается при "
+            "добавлении комментария."
+        )
+
+    location = post_with_published_location.location
+    location.name = "Новое место"
+    location.save()
+    for url in cached_urls:
+        _, response = _queries_for(client, url)
+        assert "Новое место" in response.content.decode(), (
+            f"Убедитесь, что кеш страницы `{url}` сбрасывается при "
+            "изменении местоположения."
+        )
+
+
+def _rendered_cards(response):
+    return [
+        template.name for template in response.templates
+        if template.name == "includes/post_card.html"
+    ]
+
+
+def test_post_cards_are_cached(
+        user_client, cached_urls, post_with_published_location
+):
+    response = user_client.get(cached_urls[0])
+    assert _rendered_cards(response)
+    for url in cached_urls:
+        response = user_client.get(url)
+        assert not _rendered_cards(response), (
+            "Убедитесь, что карточка публикации берётся из кеша фрагментов."
+        )
+
+    post = post_with_published_location
+    post.title = "Новый заголовок"
+    post.save()
+    response = user_client.get(cached_urls[0])
+    assert _rendered_cards(response) and "Новый заголовок" in (
+        response.content.decode()
+    ), "Убедитесь, что кеш карточки сбрасывается при изменении публикации."
+
+
+def _rendered_pages(response):
+    return [
+        template.name for template in response.templates
+        if template.name.startswith("blog/")
+    ]
+
+
+def test_member_pages_are_shared(
+        mixer: Mixer, user, another_user, user_client, another_user_client,
+        post_with_published_location
+):
+    post = post_with_published_location
+    mixer.blend("blog.Comment", post=post, author=user)
+    url = f"/posts/{post.id}/"
+
+    response = user_client.get(url)
+    assert _rendered_pages(response)
+    content = response.content.decode()
+    assert user.username in content and "Удалить публикацию" in content
+    assert "Удалить комментарий" in content
+
+    response = another_user_client.get(url)
+    assert not _rendered_pages(response), (
+        "Убедитесь, что страница для авторизованных пользователей берётся "
+        "из общего кеша."
+    )
+    content = response.content.decode()
+    assert another_user.username in content, (
+        "Убедитесь, что меню пользователя подставляется в закешированную "
+        "страницу для каждого пользователя."
+    )
+    assert "Удалить публикацию" not in content, (
+        "Убедитесь, что кнопки автора не попадают в общий кеш страницы."
+    )
+    assert "Удалить комментарий" not in content
+    assert "csrfmiddlewaretoken" in content and "<!--hole:" not in content
+
+
+def test_hidden_post_page_is_not_shared(
+        user_client, another_user_client, post_with_published_location
+):
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+    url = f"/posts/{post.id}/"
+    assert user_client.get(url).status_code == 200
+    assert another_user_client.get(url).status_code == 404, (
+        "Убедитесь, что скрытая публикация автора не попадает в общий кеш."
+    )
+
+
+def test_signup_keeps_pages_cached(mixer: Mixer, client, cached_urls):
+    for url in cached_urls:
+        _queries_for(client, url)
+    mixer.blend("auth.User")
+    for url in cached_urls:
+        n_queries, _ = _queries_for(client, url)
+        assert n_queries == 0, (
+            f"Убедитесь, что регистрация нового пользователя не сбрасывает "
+            f"кеш страницы `{url}`."
+        )
+
+
+def test_renamed_author_pages_are_invalidated(
+        mixer: Mixer, client, user, another_user, cached_urls,
+        post_with_published_location
+):
+    mixer.blend(
+        "blog.Comment", post=post_with_published_location,
+        author=another_user
+    )
+    post_url = f"/posts/{post_with_published_location.id}/"
+    for url in (*cached_urls, post_url):
+        _queries_for(client, url)
+
+    another_user.username = "renamed_commentator"
+    another_user.save()
+    _, response = _queries_for(client, post_url)
+    assert "renamed_commentator" in response.content.decode(), (
+        "Убедитесь, что кеш публикации сбрасывается при изменении имени "
+        "автора комментария."
+    )
+
+    old_profile = cached_urls[2]
+    user.username = "renamed_author"
+    user.save()
+    for url in cached_urls[:2]:
+        _, response = _queries_for(client, url)
+        assert "renamed_author" in response.content.decode(), (
+            f"Убедитесь, что кеш страницы `{url}` сбрасывается при "
+            "изменении имени автора."
+        )
+    assert client.get(old_profile).status_code == 404
+
+
+def test_versions_change_after_commit(
+        mixer: Mixer, another_user, post_with_published_location
+):
+    from blog.caching import get_version_stamp, post_scope
+
+    scope = post_scope(post_with_published_location.pk)
+    stamp = get_version_stamp(scope)
+    with transaction.atomic():
+        mixer.blend(
+            "blog.Comment", post=post_with_published_location,
+            author=another_user
+        )
+        assert get_version_stamp(scope) == stamp, (
+            "Убедитесь, что версия кеша меняется только после фиксации "
+            "транзакции: иначе читатель сохранит под новой версией "
+            "старые данные."
+        )
+    assert get_version_stamp(scope) != stamp
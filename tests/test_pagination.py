@@ -0,0 +1,130 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from bs4 import BeautifulSoup
+from conftest import N_PER_PAGE
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def feed_posts(mixer: Mixer, user, published_category):
+    same_date = timezone.now() - timedelta(days=1)
+    dates = [same_date] * 5 + [
+        timezone.now() - timedelta(days=day) for day in range(2, 22)
+    ]
+    return mixer.cycle(len(dates)).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=(date for date in dates),
+    )
+
+
+def _walk(client, url, direction):
+    pages = []
+    response = client.get(url)
+    while True:
+        assert response.status_code == HTTPStatus.OK
+        page = response.context["page_obj"]
+        pages.append([post.id for post in page])
+        cursor = getattr(page, f"{direction}_cursor")
+        if not cursor:
+            return pages, page
+        response = client.get(url, {"cursor": cursor})
+
+
+def test_cursor_pagination_walks_whole_feed(client, feed_posts):
+    expected = [
+        post.id for post in sorted(
+            feed_posts, key=lambda post: (post.pub_date, post.id),
+            reverse=True
+        )
+    ]
+    pages, last_page = _walk(client, "/", "next")
+    assert [len(ids) for ids in pages] == [N_PER_PAGE, N_PER_PAGE, 5], (
+        "Убедитесь, что курсорная пагинация отдаёт страницы по "
+        f"{N_PER_PAGE} публикаций."
+    )
+    assert sum(pages, []) == expected, (
+        "Убедитесь, что курсорная пагинация не теряет и не повторяет "
+        "публикации с одинаковой датой."
+    )
+
+    response = client.get("/", {"cursor": last_page.previous_cursor})
+    assert [post.id for post in response.context["page_obj"]] == pages[1], (
+        "Убедитесь, что ссылка на предыдущую страницу ведёт на ту же "
+        "страницу, с которой пришёл читатель."
+    )
+
+
+def test_page_number_links_still_work(client, feed_posts):
+    response = client.get("/", {"page": 2})
+    assert response.status_code == HTTPStatus.OK
+    assert response.context["page_obj"].number == 2, (
+        "Убедитесь, что старые ссылки вида `?page=N` продолжают работать."
+    )
+
+
+def test_invalid_cursor_returns_404(client, feed_posts):
+    response = client.get("/", {"cursor": "not-a-cursor"})
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_page_window_is_bounded(mixer: Mixer, user, published_category):
+    mixer.cycle(N_PER_PAGE * 12).blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+    client = Client()
+    client.get("/", {"page": 6})
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get("/", {"page": 6})
+    page_numbers = [
+        item.get_text(strip=True) for item in BeautifulSoup(
+            response.content.decode("utf-8"), features="html.parser"
+        ).select(".page-item")
+        if item.get_text(strip=True).isdigit()
+    ]
+    assert page_numbers == ["1", "4", "5", "6", "7", "8", "12"], (
+        "Убедитесь, что пагинатор показывает ограниченное окно страниц, "
+        "а не ссылку на каждую страницу."
+    )
+    assert not [
+        query for query in queries.captured_queries
+        if "COUNT(" in query["sql"]
+    ], "Убедитесь, что число публикаций для пагинатора берётся из кеша."
+
+
+def test_feed_count_survives_comments(
+        mixer: Mixer, client, user, published_category, feed_posts
+):
+    def count_queries():
+        with CaptureQueriesContext(connection) as context:
+            client.get("/", {"page": 2})
+        return [
+            query for query in context.captured_queries
+            if "COUNT(" in query["sql"]
+        ]
+
+    count_queries()
+    mixer.blend("blog.Comment", post=feed_posts[0], author=user)
+    assert not count_queries(), (
+        "Убедитесь, что число публикаций ленты не пересчитывается после "
+        "каждого комментария."
+    )
+    mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() - timedelta(hours=1))
+    assert count_queries(), (
+        "Убедитесь, что число публикаций ленты пересчитывается, когда "
+        "в ленте появляется новая публикация."
+    )
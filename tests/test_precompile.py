@@ -0,0 +1,68 @@
+from io import StringIO
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from django.template import engines
+
+from core.precompile import precompile
+
+CACHED_LOADERS = [
+    ("django.template.loaders.cached.Loader", [
+        ("core.template_loaders.Loader", [
+            "django.template.loaders.filesystem.Loader",
+        ]),
+    ]),
+]
+
+
+@pytest.fixture
+def template_dir(settings, tmp_path):
+    (tmp_path / "includes").mkdir()
+    (tmp_path / "base.html").write_text(
+        "<main>\n  {% block content %}{% endblock %}\n</main>")
+    (tmp_path / "includes/item.html").write_text(
+        "{% for item in items %}<li>{{ item }}</li>{% endfor %}")
+    settings.TEMPLATES = [{
+        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "DIRS": [tmp_path],
+        "OPTIONS": {"loaders": CACHED_LOADERS},
+    }]
+    return tmp_path
+
+
+def test_project_templates_compile():
+    out = StringIO()
+    call_command("check_templates", stdout=out)
+    assert "base.html" in out.getvalue(), (
+        "Убедитесь, что команда check_templates показывает время "
+        "компиляции шаблонов проекта."
+    )
+
+
+def test_precompile_fills_cached_loader(template_dir):
+    precompile()
+    loader = engines["django"].engine.template_loaders[0]
+    assert {"base.html", "includes/item.html"} <= set(
+        loader.get_template_cache), (
+        "Убедитесь, что при запуске шаблоны компилируются в кеш "
+        "cached.Loader."
+    )
+
+
+def test_cached_chain_minifies(template_dir):
+    template = engines["django"].get_template("base.html").template
+    assert template.source == (
+        "<main>\n{% block content %}{% endblock %}\n</main>"
+    ), (
+        "Убедитесь, что шаблоны, загруженные через cached.Loader, тоже "
+        "сжимаются."
+    )
+
+
+def test_broken_template_fails(template_dir):
+    (template_dir / "broken.html").write_text("{% if %}")
+    with pytest.raises(ImproperlyConfigured, match="broken.html"):
+        precompile()
+    with pytest.raises(CommandError, match="broken.html"):
+        call_command("check_templates", stdout=StringIO())
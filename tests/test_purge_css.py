@@ -0,0 +1,47 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+
+from core.css import (COMMENT_RE, CRITICAL_TEMPLATE, PURGED_STYLESHEET,
+                      SOURCE_STYLESHEET, class_names, select,
+                      used_tokens)
+
+
+def _read(path):
+    return Path(path).read_text(encoding="utf-8")
+
+
+def _classes(css):
+    return class_names(COMMENT_RE.sub("", css))
+
+
+def test_purged_bundle_keeps_template_classes():
+    static_dir = Path(settings.STATICFILES_DIRS[0])
+    bootstrap = _read(static_dir / SOURCE_STYLESHEET)
+    purged = _classes(_read(static_dir / PURGED_STYLESHEET))
+    # Классы правил, которые применимы к разметке шаблонов.
+    needed = _classes(select(bootstrap, used_tokens()))
+    missing = needed - purged
+    assert not missing, (
+        "Шаблоны используют классы, которых нет в сокращённой таблице "
+        f"стилей: {', '.join(sorted(missing))}. Выполните "
+        "`python manage.py purge_css`."
+    )
+    assert len(purged) < len(_classes(bootstrap))
+
+
+def test_purged_bundle_is_up_to_date(tmp_path):
+    call_command(
+        "purge_css", output=tmp_path / "purged.css",
+        critical_output=tmp_path / "critical.html"
+    )
+    static_dir = Path(settings.STATICFILES_DIRS[0])
+    template_dir = Path(settings.TEMPLATES[0]["DIRS"][0])
+    assert _read(tmp_path / "purged.css") == _read(
+        static_dir / PURGED_STYLESHEET), (
+        "Убедитесь, что сокращённая таблица стилей собрана по текущим "
+        "шаблонам: выполните `python manage.py purge_css`."
+    )
+    assert _read(tmp_path / "critical.html") == _read(
+        template_dir / CRITICAL_TEMPLATE)
@@ -0,0 +1,72 @@
+import re
+from typing import List
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+# Полный проход по таблице или сортировка во временном B-дереве.
+# Упорядоченный обход индекса (`SCAN ... USING INDEX`) с LIMIT допустим.
+BAD_PLAN_STEP = re.compile(
+    r"^(SCAN \w+(?! USING (COVERING )?INDEX)( |$)|USE TEMP B-TREE)"
+)
+
+
+def _query_plan(sql: str) -> List[str]:
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def _assert_indexed(client, url: str):
+    # Из кеша страница отдаётся без запросов, и проверять было бы нечего.
+    cache.clear()
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200, url
+    assert context.captured_queries, url
+    for query in context.captured_queries:
+        if not query["sql"].startswith("SELECT"):
+            continue
+        plan = _query_plan(query["sql"])
+        bad_steps = [
+            step for step in plan if BAD_PLAN_STEP.match(step)
+        ]
+        assert not bad_steps, (
+            f"Запрос страницы `{url}` не использует подходящий индекс:\n"
+            f"{query['sql']}\n" + "\n".join(plan)
+        )
+
+
+@pytest.fixture
+def indexed_pages(
+        mixer: Mixer, user, another_user, published_category,
+        many_posts_with_published_locations, future_posts
+):
+    post = many_posts_with_published_locations[0]
+    mixer.cycle(3).blend("blog.Comment", post=post, author=another_user)
+    return [
+        "/",
+        "/?page=2",
+        f"/category/{published_category.slug}/",
+        f"/profile/{user.username}/",
+        f"/posts/{post.id}/",
+    ]
+
+
+def test_view_queries_use_indexes(
+        indexed_pages, client, user_client, another_user_client
+):
+    for client_ in (client, user_client, another_user_client):
+        for url in indexed_pages:
+            _assert_indexed(client_, url)
+
+
+def test_next_page_query_uses_indexes(client, indexed_pages):
+    for url in indexed_pages[2:4]:
+        cursor = client.get(url).context["page_obj"].next_cursor
+        _assert_indexed(client, f"{url}?cursor={cursor}")
@@ -0,0 +1,71 @@
+import os
+from io import BytesIO
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from mixer.backend.django import Mixer
+from PIL import Image
+
+from blog.images import build_variants, recount_image_blobs
+from blog.models import ImageBlob, ImageVariant, Post
+from blog.storage import is_sharded
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _jpeg(color):
+    buffer = BytesIO()
+    Image.new("RGB", (40, 30), color=color).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+def test_new_uploads_are_sharded(mixer: Mixer, user, published_category):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        image=ContentFile(_jpeg((7, 8, 9)), name="sharded.jpg")
+    )
+    directory, filename = os.path.split(post.image.name)
+    assert is_sharded(post.image.name), (
+        "Убедитесь, что новые фотографии сохраняются в каталоги по "
+        "префиксам хеша."
+    )
+    assert directory == f"posts_images/{filename[:2]}/{filename[2:4]}"
+
+
+def test_shard_media_command(mixer: Mixer, user, published_category):
+    storage = Post._meta.get_field("image").storage
+    legacy = "posts_images/legacy_flat.jpg"
+    os.makedirs(os.path.dirname(storage.path(legacy)), exist_ok=True)
+    with open(storage.path(legacy), "wb") as file:
+        file.write(_jpeg((10, 11, 12)))
+    posts = mixer.cycle(2).blend(
+        "blog.Post", author=user, category=published_category, image="")
+    Post.objects.filter(pk__in=[post.pk for post in posts]).update(
+        image=legacy)
+    recount_image_blobs()
+    build_variants(legacy)
+    old_variants = set(ImageVariant.objects.values_list("file", flat=True))
+
+    call_command("shard_media", batch_size=1)
+    names = set(Post.objects.values_list("image", flat=True))
+    assert len(names) == 1, (
+        "Убедитесь, что команда переносит фотографию для всех публикаций."
+    )
+    name = names.pop()
+    assert is_sharded(name) and storage.exists(name), (
+        "Убедитесь, что команда переносит фотографии в каталоги по "
+        "префиксам хеша."
+    )
+    assert not storage.exists(legacy)
+    assert ImageBlob.objects.get(name=name).refcount == 2
+    for variant in ImageVariant.objects.all():
+        assert variant.source == name
+        assert variant.file.name not in old_variants
+        assert storage.exists(variant.file.name)
+    assert not any(storage.exists(old) for old in old_variants)
+
+    call_command("shard_media")
+    assert set(Post.objects.values_list("image", flat=True)) == {name}, (
+        "Убедитесь, что повторный запуск команды ничего не меняет."
+    )
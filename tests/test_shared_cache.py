@@ -0,0 +1,23 @@
+import pytest
+
+from core.checks import check_shared_cache
+
+LOCMEM = {"default": {
+    "BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+@pytest.mark.parametrize("debug, caches, errors", [
+    (False, LOCMEM, ["core.E001"]),
+    (True, LOCMEM, []),
+    (False, {"default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": "/tmp/blogicum_test_cache",
+    }}, []),
+], ids=["locmem", "debug", "filebased"])
+def test_local_cache_is_refused_in_production(settings, debug, caches, errors):
+    settings.DEBUG = debug
+    settings.CACHES = caches
+    assert [error.id for error in check_shared_cache(None)] == errors, (
+        "Убедитесь, что вне режима отладки проверка запрещает кеш в памяти "
+        "процесса: сброс версий не дойдёт до других процессов."
+    )
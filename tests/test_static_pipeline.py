@@ -0,0 +1,94 @@
+import gzip
+
+import pytest
+from bs4 import BeautifulSoup
+from django.core.management import call_command
+from django.templatetags.static import static
+
+
+@pytest.mark.django_db
+def test_stylesheet_is_self_hosted_and_preloaded(client):
+    response = client.get("/")
+    head = BeautifulSoup(
+        response.content.decode(), features="html.parser"
+    ).find("head")
+    hrefs = [link["href"] for link in head.find_all("link", rel="stylesheet")]
+    assert static("css/bootstrap.purged.min.css") in hrefs, (
+        "Убедитесь, что Bootstrap подключается из статических файлов "
+        "проекта."
+    )
+    assert not any(href.startswith(("http:", "https:", "//"))
+                   for href in hrefs)
+    assert head.find("style"), (
+        "Убедитесь, что правила первого экрана встроены в страницу."
+    )
+    assert (
+        f"<{static('css/bootstrap.purged.min.css')}>; rel=preload; as=style"
+        in response["Link"]
+    ), "Убедитесь, что таблица стилей указана в заголовке Link: preload."
+
+
+@pytest.fixture
+def collected(settings, tmp_path):
+    settings.STATIC_ROOT = tmp_path
+    settings.STATICFILES_STORAGE = (
+        "core.staticfiles.CompressedManifestStaticFilesStorage")
+    call_command("collectstatic", interactive=False, verbosity=0)
+    return tmp_path
+
+
+def test_collectstatic_fingerprints_and_compresses(client, collected):
+    url = static("css/bootstrap.purged.min.css")
+    assert url != "/static/css/bootstrap.purged.min.css", (
+        "Убедитесь, что имена статических файлов содержат хеш."
+    )
+    name = url[len("/static/"):]
+    assert (collected / f"{name}.gz").exists(), (
+        "Убедитесь, что collectstatic сохраняет сжатые копии файлов."
+    )
+
+    response = client.get(url, HTTP_ACCEPT_ENCODING="gzip, deflate")
+    assert response["Content-Encoding"] == "gzip"
+    assert response["Content-Type"].startswith("text/css")
+    assert "Accept-Encoding" in response["Vary"]
+    assert "immutable" in response["Cache-Control"]
+    body = gzip.decompress(b"".join(response.streaming_content))
+    assert body == (collected / name).read_bytes()
+
+    response = client.get(url)
+    assert "Content-Encoding" not in response
+    assert b"".join(response.streaming_content) == body
+
+
+def test_collectstatic_writes_brotli_copies(client, collected):
+    brotli = pytest.importorskip("brotli")
+    name = static("css/bootstrap.purged.min.css")[len("/static/"):]
+    assert (collected / f"{name}.br").exists(), (
+        "Убедитесь, что collectstatic сохраняет копии файлов в brotli."
+    )
+    response = client.get(
+        static("css/bootstrap.purged.min.css"),
+        HTTP_ACCEPT_ENCODING="gzip, deflate, br"
+    )
+    assert response["Content-Encoding"] == "br"
+    body = brotli.decompress(b"".join(response.streaming_content))
+    assert body == (collected / name).read_bytes()
+
+
+@pytest.mark.parametrize("accept_encoding, expected", [
+    ("br;q=0, gzip", "gzip"),
+    ("gzip;q=0, br;q=0", None),
+    ("gzip, br;q=0.5", "gzip"),
+])
+def test_static_encoding_respects_weights(
+        client, collected, accept_encoding, expected
+):
+    pytest.importorskip("brotli")
+    response = client.get(
+        static("css/bootstrap.purged.min.css"),
+        HTTP_ACCEPT_ENCODING=accept_encoding
+    )
+    assert response.get("Content-Encoding") == expected, (
+        "Убедитесь, что сжатая копия выбирается с учётом весов q "
+        "в заголовке Accept-Encoding."
+    )
@@ -0,0 +1,36 @@
+import re
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from core.template_loaders import minify
+
+
+def test_minify_keeps_preformatted_text():
+    source = (
+        "<ul>\n    <li>{{ a }}</li>\n\n    <li>b</li>\n</ul>\n"
+        "<pre>\n  код\n    с отступами\n</pre>\n"
+        "<textarea name=\"text\">\n  строка\n</textarea>"
+    )
+    assert minify(source) == (
+        "<ul>\n<li>{{ a }}</li>\n<li>b</li>\n</ul>\n"
+        "<pre>\n  код\n    с отступами\n</pre>\n"
+        "<textarea name=\"text\">\n  строка\n</textarea>"
+    )
+
+
+@pytest.mark.django_db
+def test_templates_are_minified_on_load(client, post_with_published_location):
+    content = client.get("/").content.decode()
+    assert not re.search(r"\n[ \t]+<", content), (
+        "Убедитесь, что отступы в шаблонах проекта удаляются при загрузке "
+        "шаблона."
+    )
+
+
+@pytest.mark.django_db
+def test_size_report(post_with_published_location):
+    out = StringIO()
+    call_command("template_size_report", stdout=out)
+    assert "blog:index" in out.getvalue()
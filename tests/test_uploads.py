@@ -0,0 +1,95 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.utils import timezone
+from PIL import Image
+
+from blog.models import ChunkedUpload, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _jpeg(size=(100, 100)):
+    buffer = BytesIO()
+    Image.new("RGB", size, color=(73, 109, 137)).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def post_data(published_category):
+    return {
+        "title": "Фото",
+        "text": "Текст",
+        "pub_date": timezone.now().strftime("%Y-%m-%d %H:%M"),
+        "category": published_category.id,
+    }
+
+
+def _create(user_client, post_data, **files):
+    return user_client.post("/posts/create/", {**post_data, **files})
+
+
+def test_upload_limits(monkeypatch, user_client, post_data):
+    monkeypatch.setattr("blog.uploads.IMAGE_MAX_UPLOAD_SIZE", 100)
+    monkeypatch.setattr("blog.forms.IMAGE_MAX_UPLOAD_SIZE", 100)
+    response = _create(user_client, post_data, image=SimpleUploadedFile(
+        "big.jpg", _jpeg(), content_type="image/jpeg"))
+    assert response.status_code == 200
+    assert response.context["form"].has_error("image", "too_large"), (
+        "Убедитесь, что слишком большой файл отклоняется формой."
+    )
+    monkeypatch.undo()
+
+    monkeypatch.setattr("blog.forms.IMAGE_MAX_PIXELS", 100)
+    response = _create(user_client, post_data, image=SimpleUploadedFile(
+        "wide.jpg", _jpeg(), content_type="image/jpeg"))
+    assert response.context["form"].has_error("image", "too_many_pixels"), (
+        "Убедитесь, что число пикселей проверяется по заголовку "
+        "изображения."
+    )
+    assert not Post.objects.exists()
+
+
+def _put(client, upload_id, data, start, total):
+    return client.put(
+        f"/uploads/{upload_id}/", data,
+        content_type="application/octet-stream",
+        HTTP_CONTENT_RANGE=f"bytes {start}-{start + len(data) - 1}/{total}",
+    )
+
+
+def test_chunked_upload_resumes(user_client, another_user_client, post_data):
+    content = _jpeg()
+    half = len(content) // 2
+    response = user_client.post(
+        "/uploads/", {"filename": "photo.jpg", "size": len(content)})
+    assert response.status_code == 201
+    upload_id = response.json()["id"]
+
+    assert _put(user_client, upload_id, content[:half], 0,
+                len(content)).json()["offset"] == half
+    # Повтор уже принятой части после обрыва ничего не ломает.
+    assert _put(user_client, upload_id, content[:half], 0,
+                len(content)).json()["offset"] == half
+    response = _put(user_client, upload_id, content[-10:],
+                    len(content) - 10, len(content))
+    assert response.status_code == 409 and response.json()["offset"] == half
+    assert another_user_client.get(
+        f"/uploads/{upload_id}/").status_code == 404
+
+    incomplete = _create(user_client, post_data, image_upload=upload_id)
+    assert incomplete.context["form"].errors["image"]
+
+    _put(user_client, upload_id, content[half:], half, len(content))
+    assert user_client.get(f"/uploads/{upload_id}/").json() == {
+        "offset": len(content), "size": len(content)}
+
+    response = _create(user_client, post_data, image_upload=upload_id)
+    assert response.status_code == 302
+    post = Post.objects.get()
+    assert post.image.read() == content, (
+        "Убедитесь, что загруженная по частям фотография сохраняется "
+        "в публикации."
+    )
+    assert not ChunkedUpload.objects.exists()
@@ -0,0 +1,117 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _is_visible(post):
+    post.refresh_from_db(fields=["is_visible"])
+    return post.is_visible
+
+
+def test_category_flip_updates_posts(
+        post_with_published_location, published_category
+):
+    post = post_with_published_location
+    assert _is_visible(post)
+
+    published_category.is_published = False
+    published_category.save()
+    assert not _is_visible(post), (
+        "Убедитесь, что публикации скрываются из ленты при снятии категории "
+        "с публикации."
+    )
+
+    published_category.is_published = True
+    published_category.save()
+    assert _is_visible(post), (
+        "Убедитесь, что публикации возвращаются в ленту при повторной "
+        "публикации категории."
+    )
+
+
+def test_due_posts_are_published(mixer: Mixer, user, published_category):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() + timedelta(minutes=5)
+    )
+    assert not _is_visible(post)
+
+    type(post).objects.filter(pk=post.pk).update(
+        pub_date=timezone.now() - timedelta(minutes=1))
+    call_command("publish_due_posts")
+    assert _is_visible(post), (
+        "Убедитесь, что отложенная публикация попадает в ленту, когда "
+        "наступает время её публикации."
+    )
+
+
+def test_scheduled_post_goes_live_when_due(
+        mixer: Mixer, user, published_category
+):
+    from blog.publication import posts_published, publish_if_due
+
+    due = timezone.now() + timedelta(minutes=5)
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=due
+    )
+    events = []
+
+    def receiver(sender, **kwargs):
+        events.append(kwargs)
+
+    posts_published.connect(receiver)
+    try:
+        publish_if_due(now=due)
+        assert not _is_visible(post) and not events, (
+            "Убедитесь, что отложенная публикация не попадает в ленту "
+            "раньше своего времени."
+        )
+        publish_if_due(now=due + timedelta(seconds=1))
+    finally:
+        posts_published.disconnect(receiver)
+    assert _is_visible(post)
+    assert [event["count"] for event in events] == [1], (
+        "Убедитесь, что при выходе отложенной публикации отправляется "
+        "сигнал `posts_published`."
+    )
+
+
+@pytest.mark.parametrize("is_published", (True, False))
+def test_post_detail_is_resolved_in_one_query(
+        user_client, another_user_client, post_with_published_location,
+        is_published
+):
+    post = post_with_published_location
+    post.is_published = is_published
+    post.save()
+    url = f"/posts/{post.id}/"
+    with CaptureQueriesContext(connection) as context:
+        response = user_client.get(url)
+    assert response.status_code == 200
+    post_queries = [
+        query for query in context.captured_queries
+        if 'FROM "blog_post"' in query["sql"]
+        and '"blog_post"."id" =' in query["sql"]
+    ]
+    assert len(post_queries) == 1, (
+        "Убедитесь, что страница публикации проверяет видимость "
+        "публикации одним запросом."
+    )
+    assert not [
+        query for query in context.captured_queries
+        if 'FROM "blog_category"' in query["sql"]
+        or 'FROM "blog_location"' in query["sql"]
+    ], (
+        "Убедитесь, что категория и местоположение публикации загружаются "
+        "тем же запросом."
+    )
+    expected = 200 if is_published else 404
+    assert another_user_client.get(url).status_code == expected